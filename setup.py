@@ -1,5 +1,9 @@
+import hashlib
+import json
 import os
 import re
+import shlex
+import shutil
 import subprocess
 import sys
 import sysconfig
@@ -11,6 +15,9 @@ extra_compile_args = []
 if sys.platform != "win32":
     extra_compile_args = ["-std=c++17"]
 
+# Snapshot of the interpreter's build configuration, read once per setup.py run
+SYSCONFIG_VARS = sysconfig.get_config_vars()
+
 ext_module = Extension(
     "malwi_box._audit_hook",
     sources=["src/malwi_box/malwi_box.cpp"],
@@ -24,21 +31,47 @@ def get_python_version() -> str:
     return f"{sys.version_info.major}.{sys.version_info.minor}"
 
 
-def get_config_version(ldflags: str) -> str | None:
+def get_config_version(ldflags: list[str]) -> str | None:
     """Extract Python version from ldflags (e.g., -lpython3.10 -> 3.10)."""
-    match = re.search(r'-lpython(\d+\.\d+)', ldflags)
-    if match:
-        return match.group(1)
+    for flag in ldflags:
+        match = re.match(r'-lpython(\d+\.\d+)', flag)
+        if match:
+            return match.group(1)
     return None
 
 
+def is_up_to_date(target: str, sources: list[str]) -> bool:
+    """Check if target exists and is at least as new as every existing source."""
+    try:
+        target_mtime = os.path.getmtime(target)
+    except OSError:
+        return False
+    source_mtimes = [os.path.getmtime(s) for s in sources if os.path.exists(s)]
+    return all(target_mtime >= mtime for mtime in source_mtimes)
+
+
+def get_python_config_flags(python_config: str) -> tuple[str, str]:
+    """Get (cflags, ldflags) from a single python3-config invocation.
+
+    python3-config prints one line per requested flag group, so both sets of
+    flags can be fetched with one process spawn instead of two.
+    """
+    output = subprocess.check_output(
+        [python_config, "--cflags", "--ldflags", "--embed"], text=True
+    )
+    lines = output.strip().splitlines()
+    if len(lines) < 2:
+        raise subprocess.CalledProcessError(0, python_config, output)
+    return lines[0].strip(), lines[1].strip()
+
+
 def get_python_build_flags() -> dict[str, str] | None:
     """Get build flags directly from Python's sysconfig.
 
     This is a fallback when python3-config is unavailable or returns wrong flags.
     """
     include = sysconfig.get_path("include")
-    libdir = sysconfig.get_config_var("LIBDIR") or ""
+    libdir = SYSCONFIG_VARS.get("LIBDIR") or ""
     version = get_python_version()
 
     cflags = f"-I{include}"
@@ -46,9 +79,9 @@ def get_python_build_flags() -> dict[str, str] | None:
 
     # Check for framework build on macOS
     if sys.platform == "darwin":
-        framework = sysconfig.get_config_var("PYTHONFRAMEWORK")
+        framework = SYSCONFIG_VARS.get("PYTHONFRAMEWORK")
         if framework:
-            framework_prefix = sysconfig.get_config_var("PYTHONFRAMEWORKPREFIX") or ""
+            framework_prefix = SYSCONFIG_VARS.get("PYTHONFRAMEWORKPREFIX") or ""
             ldflags = f"-framework {framework}"
             if framework_prefix:
                 ldflags = f"-F{framework_prefix} " + ldflags
@@ -58,7 +91,7 @@ def get_python_build_flags() -> dict[str, str] | None:
     if sys.platform == "darwin":
         ldflags += " -framework CoreFoundation"
 
-    prefix = sysconfig.get_config_var("prefix") or ""
+    prefix = SYSCONFIG_VARS.get("prefix") or ""
 
     if include and prefix:
         return {
@@ -79,19 +112,68 @@ class CustomBuildExt(build_ext):
     """
 
     def run(self):
-        super().run()
         # Only build malwi_python for inplace/development builds
-        if self.inplace:
-            self.build_malwi_python()
-
-    def build_malwi_python(self):
-        """Build the malwi_python embedded interpreter wrapper for development."""
-        src = "src/malwi_box/malwi_python.c"
-        if not os.path.exists(src):
+        if not self.inplace:
+            super().run()
             return
 
-        out_file = "src/malwi_box/malwi_python"
+        # The wrapper does not depend on the C++ extension, so start its
+        # compiler in the background and build the extension meanwhile.
+        wrapper_build = self.start_malwi_python_build()
+        try:
+            super().run()
+        finally:
+            self.finish_malwi_python_build(wrapper_build)
+
+    def get_cached_python_config_flags(
+        self, python_config: str
+    ) -> tuple[list[str], list[str]]:
+        """Get python3-config flags as argv lists, reusing a cached copy.
+
+        The output only depends on the interpreter and the python3-config
+        script, so it is cached under build_temp keyed by both, already
+        split into arguments. Repeated `pip install -e .` runs then skip
+        both the subprocess and the shell-style parsing.
+        """
+        config_path = shutil.which(python_config) or python_config
+        try:
+            config_mtime = os.stat(config_path).st_mtime_ns
+        except OSError:
+            cflags, ldflags = get_python_config_flags(python_config)
+            return shlex.split(cflags), shlex.split(ldflags)
 
+        key_source = f"{os.path.realpath(sys.executable)}:{config_path}:{config_mtime}"
+        key = hashlib.sha1(key_source.encode()).hexdigest()
+        cache_file = os.path.join(self.build_temp, f"pyflags-{key}.json")
+
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            return cached["cflags"], cached["ldflags"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        cflags, ldflags = get_python_config_flags(python_config)
+        cflags, ldflags = shlex.split(cflags), shlex.split(ldflags)
+        try:
+            os.makedirs(self.build_temp, exist_ok=True)
+            with open(cache_file, "w") as f:
+                json.dump({"cflags": cflags, "ldflags": ldflags}, f)
+        except OSError:
+            pass  # Caching is best-effort
+        return cflags, ldflags
+
+    def get_malwi_python_commands(
+        self, src: str, obj_file: str, out_file: str
+    ) -> tuple[list[str], list[str]] | None:
+        """Build the compile and link argv for malwi_python.
+
+        Compiling and linking are separate steps so that ccache (which does
+        not cache link invocations) can serve the compile from its cache.
+
+        Returns:
+            Tuple of (compile_cmd, link_cmd), or None if flags are unavailable.
+        """
         # Get Python build flags using python3-config
         # Resolve symlinks to find the real Python installation directory
         real_executable = os.path.realpath(sys.executable)
@@ -106,12 +188,7 @@ class CustomBuildExt(build_ext):
         target_version = get_python_version()
 
         try:
-            cflags = subprocess.check_output(
-                [python_config, "--cflags"], text=True
-            ).strip()
-            ldflags = subprocess.check_output(
-                [python_config, "--ldflags", "--embed"], text=True
-            ).strip()
+            cflags, ldflags = self.get_cached_python_config_flags(python_config)
 
             # Validate that python3-config matches current Python version
             config_version = get_config_version(ldflags)
@@ -131,40 +208,131 @@ class CustomBuildExt(build_ext):
         if use_fallback:
             fallback_flags = get_python_build_flags()
             if fallback_flags:
-                cflags = fallback_flags['cflags']
-                ldflags = fallback_flags['ldflags']
+                cflags = shlex.split(fallback_flags['cflags'])
+                ldflags = shlex.split(fallback_flags['ldflags'])
                 lib_dir = fallback_flags['lib_dir']
                 python_home = fallback_flags['python_home']
                 print(f"Using fallback build flags for Python {target_version}")
             else:
                 print("Warning: Fallback method also failed. Skipping malwi_python build.")
                 print("Try: uv run python3 setup.py build_ext --inplace")
-                return
+                return None
         else:
             # Get the library directory for rpath
-            lib_dir = sysconfig.get_config_var("LIBDIR")
-            if not lib_dir:
-                lib_dir = os.path.join(os.path.dirname(python_dir), "lib")
-
-            python_home = sysconfig.get_config_var("prefix")
-            if not python_home:
-                python_home = os.path.dirname(python_dir)
+            python_root = os.path.dirname(python_dir)
+            lib_dir = SYSCONFIG_VARS.get("LIBDIR") or os.path.join(python_root, "lib")
+            python_home = SYSCONFIG_VARS.get("prefix") or python_root
 
         compiler = "clang" if sys.platform == "darwin" else "gcc"
 
-        # Build command with rpath for finding libpython at runtime
-        rpath_flag = f"-Wl,-rpath,{lib_dir}"
-        lib_flag = f"-L{lib_dir}"
-        python_home_define = f'-DDEFAULT_PYTHON_HOME=\\"{python_home}\\"'
+        # Use ccache for the compile step when available. Hash compiler content
+        # rather than mtime so the cache survives compiler reinstalls.
+        launcher = []
+        ccache = shutil.which("ccache")
+        if ccache:
+            os.environ.setdefault("CCACHE_COMPILERCHECK", "content")
+            print(f"Using ccache for malwi_python: {ccache}")
+            launcher = [ccache]
+
+        # Commands are argv lists (no shell), so paths with spaces need no quoting.
+        compile_cmd = [
+            *launcher,
+            compiler,
+            *cflags,
+            f'-DDEFAULT_PYTHON_HOME="{python_home}"',
+            "-c",
+            src,
+            "-o",
+            obj_file,
+        ]
+        # Link with rpath for finding libpython at runtime
+        link_cmd = [
+            compiler,
+            obj_file,
+            "-o",
+            out_file,
+            f"-L{lib_dir}",
+            *ldflags,
+            f"-Wl,-rpath,{lib_dir}",
+        ]
+        return compile_cmd, link_cmd
+
+    def start_malwi_python_build(self):
+        """Start compiling the malwi_python wrapper for development.
+
+        Returns:
+            Tuple of (process, link_cmd, out_file, cmd_hash, cmd_hash_file), or
+            None if the wrapper is up to date or cannot be built.
+        """
+        src = "src/malwi_box/malwi_python.c"
+        if not os.path.exists(src):
+            return None
 
-        cmd = f'{compiler} {cflags} {python_home_define} -o "{out_file}" "{src}" {lib_flag} {ldflags} {rpath_flag}'
+        out_file = "src/malwi_box/malwi_python"
+        obj_file = os.path.join(self.build_temp, "malwi_python.o")
+
+        commands = self.get_malwi_python_commands(src, obj_file, out_file)
+        if commands is None:
+            return None
+        compile_cmd, link_cmd = commands
+
+        # Skip the compile on iterative rebuilds when neither the inputs nor
+        # the compiler commands changed since the last successful build
+        python_header = os.path.join(sysconfig.get_path("include"), "Python.h")
+        cmd_hash = hashlib.sha1(
+            "\0".join(compile_cmd + ["--"] + link_cmd).encode()
+        ).hexdigest()
+        cmd_hash_file = os.path.join(self.build_temp, "malwi_python.cmdhash")
+        try:
+            with open(cmd_hash_file) as f:
+                previous_hash = f.read().strip()
+        except OSError:
+            previous_hash = None
+        if previous_hash == cmd_hash and is_up_to_date(out_file, [src, python_header]):
+            print(f"malwi_python is up to date: {out_file}")
+            return None
 
         print(f"Building malwi_python: {out_file}")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        os.makedirs(self.build_temp, exist_ok=True)
+        try:
+            process = subprocess.Popen(
+                compile_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        except OSError as e:
+            print(f"Warning: Failed to build malwi_python: {e}")
+            return None
+        return process, link_cmd, out_file, cmd_hash, cmd_hash_file
+
+    def finish_malwi_python_build(self, wrapper_build) -> None:
+        """Wait for a build started by start_malwi_python_build, then link it."""
+        if wrapper_build is None:
+            return
+
+        process, link_cmd, out_file, cmd_hash, cmd_hash_file = wrapper_build
+        _, stderr = process.communicate()
+        if process.returncode != 0:
+            print(f"Warning: Failed to build malwi_python: {stderr}")
+            return
+
+        try:
+            result = subprocess.run(link_cmd, capture_output=True, text=True)
+        except OSError as e:
+            print(f"Warning: Failed to link malwi_python: {e}")
+            return
         if result.returncode != 0:
-            print(f"Warning: Failed to build malwi_python: {result.stderr}")
-        else:
-            print(f"Built malwi_python: {out_file}")
+            print(f"Warning: Failed to link malwi_python: {result.stderr}")
+            return
+
+        print(f"Built malwi_python: {out_file}")
+        try:
+            with open(cmd_hash_file, "w") as f:
+                f.write(cmd_hash)
+        except OSError:
+            pass  # Freshness tracking is best-effort
+
+    def build_malwi_python(self):
+        """Build the malwi_python embedded interpreter wrapper for development."""
+        self.finish_malwi_python_build(self.start_malwi_python_build())
 
 
 setup(
@@ -1,11 +1,14 @@
-from importlib.metadata import version
+# Avoid importing typing at runtime: this package is imported at the start
+# of every sandboxed interpreter.
+TYPE_CHECKING = False
 
-from malwi_box.engine import BoxEngine
-from malwi_box.formatting import extract_decision_details, format_event
-from malwi_box.hook import (
-    install_hook,
-    uninstall_hook,
-)
+if TYPE_CHECKING:
+    from malwi_box.engine import BoxEngine
+    from malwi_box.formatting import extract_decision_details, format_event
+    from malwi_box.hook import (
+        install_hook,
+        uninstall_hook,
+    )
 
 __all__ = [
     "install_hook",
@@ -15,4 +18,33 @@ __all__ = [
     "extract_decision_details",
     "__version__",
 ]
-__version__ = version("malwi-box")
+
+# Public names are resolved on first access so that importing a submodule
+# (e.g. the CLI or the hook injected into every sandboxed interpreter) does
+# not pay for the engine, the C extension, or importlib.metadata up front.
+_LAZY_ATTRS = {
+    "BoxEngine": "malwi_box.engine",
+    "format_event": "malwi_box.formatting",
+    "extract_decision_details": "malwi_box.formatting",
+    "install_hook": "malwi_box.hook",
+    "uninstall_hook": "malwi_box.hook",
+}
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        from importlib.metadata import version
+
+        value = version("malwi-box")
+    elif name in _LAZY_ATTRS:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,11 +1,19 @@
 """CLI for malwi-box sandbox."""
 
-import argparse
+from __future__ import annotations
+
 import os
 import subprocess
 import sys
+from types import SimpleNamespace
 
-from malwi_box import __version__
+# Every 'malwi-box run' starts here before exec'ing the sandboxed interpreter,
+# and importing typing for its TYPE_CHECKING flag adds about 3ms on top of this
+# module's own imports. The names below are only needed by type checkers.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from pathlib import Path
 
 
 def _wrapper_not_available_error() -> str:
@@ -22,19 +30,49 @@ To fix this:
   - For development: Run 'uv run python3 setup.py build_ext --inplace'"""
 
 
-def _get_mode(args: argparse.Namespace) -> str:
-    """Get the mode from args."""
-    if getattr(args, "force", False):
-        return "force"
-    elif getattr(args, "review", False):
-        return "review"
-    return "run"
+def _prepare_env(bin_dir: Path, wrapper_env: dict[str, str]) -> dict[str, str]:
+    """Build the subprocess environment with bin_dir prepended to PATH."""
+    path = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    return os.environ | wrapper_env | {"PATH": path}
+
+
+def _run_wrapped(args: argparse.Namespace, python_args: list[str]) -> int:
+    """Run the wrapped python interpreter with python_args and return its exit code."""
+    from malwi_box.wrapper import WrapperContext
+
+    # run, eval and pip install always define --force/--review/--config
+    if args.force:
+        mode = "force"
+    elif args.review:
+        mode = "review"
+    else:
+        mode = "run"
+
+    with WrapperContext(mode, args.config_path) as wrapper:
+        if wrapper.bin_dir is None:
+            print(_wrapper_not_available_error(), file=sys.stderr)
+            return 1
+
+        env = _prepare_env(wrapper.bin_dir, wrapper.env)
+        cmd = [wrapper.python_path] + python_args
+
+        # From the CLI entry point, replace this process with the sandboxed
+        # interpreter instead of idling until it exits. Only possible when
+        # the bin dir is the cached one, as nothing is left to clean up.
+        if getattr(args, "replace_process", False) and wrapper.cached:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execve(wrapper.python_path, cmd, env)
+
+        try:
+            result = subprocess.run(cmd, env=env)
+            return result.returncode
+        except KeyboardInterrupt:
+            return 130
 
 
 def run_command(args: argparse.Namespace) -> int:
     """Run command with sandboxing using wrapper."""
-    from malwi_box.wrapper import cleanup_wrapper_bin_dir, setup_wrapper_bin_dir
-
     command = list(args.command)
 
     # Handle --review/--force in command args (legacy support)
@@ -49,58 +87,18 @@ def run_command(args: argparse.Namespace) -> int:
         print("Error: No command specified", file=sys.stderr)
         return 1
 
-    mode = _get_mode(args)
-    config_path = getattr(args, "config_path", None)
-
-    bin_dir, wrapper_env = setup_wrapper_bin_dir(mode, config_path)
-    if bin_dir is None:
-        print(_wrapper_not_available_error(), file=sys.stderr)
-        return 1
-
-    try:
-        env = os.environ.copy()
-        env.update(wrapper_env)
-        env["PATH"] = f"{bin_dir}:{env.get('PATH', '')}"
-
-        # Build command
-        first = command[0]
-        if first.endswith(".py") or os.path.isfile(first):
-            cmd = [str(bin_dir / "python")] + command
-        else:
-            cmd = [str(bin_dir / "python"), "-m"] + command
-
-        result = subprocess.run(cmd, env=env)
-        return result.returncode
-    except KeyboardInterrupt:
-        return 130
-    finally:
-        cleanup_wrapper_bin_dir(bin_dir)
+    # Build command. Scripts are usually recognizable from the name alone,
+    # so only stat the filesystem when it is ambiguous.
+    first = command[0]
+    is_script = first.endswith((".py", ".pyc", ".pyw")) or os.sep in first
+    if is_script or os.path.isfile(first):
+        return _run_wrapped(args, command)
+    return _run_wrapped(args, ["-m"] + command)
 
 
 def eval_command(args: argparse.Namespace) -> int:
     """Execute Python code string with sandboxing using wrapper."""
-    from malwi_box.wrapper import cleanup_wrapper_bin_dir, setup_wrapper_bin_dir
-
-    mode = _get_mode(args)
-    config_path = getattr(args, "config_path", None)
-
-    bin_dir, wrapper_env = setup_wrapper_bin_dir(mode, config_path)
-    if bin_dir is None:
-        print(_wrapper_not_available_error(), file=sys.stderr)
-        return 1
-
-    try:
-        env = os.environ.copy()
-        env.update(wrapper_env)
-        env["PATH"] = f"{bin_dir}:{env.get('PATH', '')}"
-
-        cmd = [str(bin_dir / "python"), "-c", args.code]
-        result = subprocess.run(cmd, env=env)
-        return result.returncode
-    except KeyboardInterrupt:
-        return 130
-    finally:
-        cleanup_wrapper_bin_dir(bin_dir)
+    return _run_wrapped(args, ["-c", args.code])
 
 
 def _build_pip_args(args: argparse.Namespace) -> list[str] | None:
@@ -130,30 +128,8 @@ def install_command(args: argparse.Namespace) -> int:
     if pip_args is None:
         return 1
 
-    from malwi_box.wrapper import cleanup_wrapper_bin_dir, setup_wrapper_bin_dir
-
-    mode = _get_mode(args)
-    config_path = getattr(args, "config_path", None)
-
-    bin_dir, wrapper_env = setup_wrapper_bin_dir(mode, config_path)
-    if bin_dir is None:
-        print(_wrapper_not_available_error(), file=sys.stderr)
-        return 1
-
-    try:
-        # Prepare environment with wrapper in PATH
-        env = os.environ.copy()
-        env.update(wrapper_env)
-        env["PATH"] = f"{bin_dir}:{env.get('PATH', '')}"
-
-        # Run pip using our wrapped python
-        cmd = [str(bin_dir / "python"), "-m", "pip"] + pip_args
-        result = subprocess.run(cmd, env=env)
-        return result.returncode
-    except KeyboardInterrupt:
-        return 130
-    finally:
-        cleanup_wrapper_bin_dir(bin_dir)
+    # Run pip using our wrapped python
+    return _run_wrapped(args, ["-m", "pip"] + pip_args)
 
 
 def config_create_command(args: argparse.Namespace) -> int:
@@ -176,7 +152,79 @@ def config_create_command(args: argparse.Namespace) -> int:
     return 0
 
 
-def main() -> int:
+def _parse_fast(argv: list[str]) -> SimpleNamespace | None:
+    """Parse common run/eval invocations without building the argparse parser.
+
+    Returns None for anything else (help, other subcommands, unknown or
+    malformed options), in which case main() falls back to argparse so that
+    usage and error messages stay the same.
+    """
+    if not argv or argv[0] not in ("run", "eval"):
+        return None
+
+    subcommand = argv[0]
+    options = {"review": False, "force": False, "config_path": None}
+    code = None
+    i = 1
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--review", "--force"):
+            options[arg[2:]] = True
+        elif arg == "--config":
+            if i + 1 >= len(argv) or argv[i + 1].startswith("-"):
+                return None
+            i += 1
+            options["config_path"] = argv[i]
+        elif arg.startswith("--config="):
+            options["config_path"] = arg[len("--config=") :]
+        elif arg.startswith("-"):
+            return None
+        elif subcommand == "run":
+            # Like argparse.REMAINDER, everything from the target on is the command
+            return SimpleNamespace(
+                subcommand="run",
+                command=argv[i:],
+                replace_process=sys.platform != "win32",
+                **options,
+            )
+        elif code is not None:
+            return None
+        else:
+            code = arg
+        i += 1
+
+    if code is None:
+        return None
+    return SimpleNamespace(
+        subcommand="eval",
+        code=code,
+        replace_process=sys.platform != "win32",
+        **options,
+    )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the full argument parser."""
+    import argparse
+
+    class _VersionAction(argparse.Action):
+        """Print the version, reading package metadata only when invoked."""
+
+        def __init__(self, option_strings, dest=argparse.SUPPRESS, help=None):
+            super().__init__(
+                option_strings=option_strings,
+                dest=dest,
+                default=argparse.SUPPRESS,
+                nargs=0,
+                help=help or "show program's version number and exit",
+            )
+
+        def __call__(self, parser, namespace, values, option_string=None):
+            from malwi_box import __version__
+
+            print(f"{parser.prog} {__version__}")
+            parser.exit()
+
     parser = argparse.ArgumentParser(
         description="Python audit hook sandbox",
         usage="%(prog)s {run,eval,pip,venv,config} ...",
@@ -184,8 +232,7 @@ def main() -> int:
     parser.add_argument(
         "--version",
         "-v",
-        action="version",
-        version=f"%(prog)s {__version__}",
+        action=_VersionAction,
     )
     subparsers = parser.add_subparsers(dest="subcommand", required=True)
 
@@ -306,7 +353,17 @@ def main() -> int:
         help="Path to config file (default: .malwi-box.toml)",
     )
 
-    args = parser.parse_args()
+    # run/eval/pip install may exec into the wrapper (POSIX only)
+    parser.set_defaults(replace_process=sys.platform != "win32")
+
+    return parser
+
+
+def main() -> int:
+    # run and eval are the hot paths; skip argparse for their common forms
+    args = _parse_fast(sys.argv[1:])
+    if args is None:
+        args = _build_parser().parse_args()
 
     if args.subcommand == "run":
         return run_command(args)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import contextlib
 import fnmatch
 import hashlib
 import ipaddress
@@ -13,12 +14,17 @@ import socket
 import sys
 import sysconfig
 import tempfile
+import time
 from pathlib import Path
-from typing import Any
 from urllib.parse import urlparse
 
 from malwi_box import toml
-from malwi_box.formatting import _build_command
+from malwi_box.formatting import _args_repr, _build_command, _is_write_mode
+
+TYPE_CHECKING = False  # Avoid importing typing at interpreter start
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
 
 # List variable expansion for config values
 # Similar to path variables but expand to multiple values
@@ -91,6 +97,37 @@ EXEC_EVENTS = frozenset(
 # Events that run shell commands (checked against allow_shell_commands)
 SHELL_EVENTS = frozenset({"subprocess.Popen", "os.system"})
 
+# DNS events that resolve an IP literal locally, without a lookup
+NUMERIC_HOST_EVENTS = frozenset({"socket.getaddrinfo", "socket.gethostbyname"})
+
+# Events whose outcome depends only on their args and the config, so an
+# allow can be remembered. File events depend on the filesystem (symlinks,
+# existence), exec events on file hashes, and DNS/connect checks resolve
+# and cache IPs as a side effect, so those are always re-checked.
+CACHEABLE_EVENTS = frozenset(
+    {
+        "os.getenv",
+        "os.environ.get",
+        "os.system",
+        "urllib.Request",
+        "http.request",
+        "socket.__new__",
+    }
+)
+
+# Maximum number of remembered allows before the cache is reset
+PERMISSION_CACHE_SIZE = 4096
+
+# Argument types used as-is in permission cache keys; others use repr()
+_CACHE_KEY_TYPES = (str, int, float, bytes, bool, type(None))
+
+# Files modified less than this long before hashing (ns) don't get their
+# digest cached, as a same-tick rewrite would keep the same stat fields
+HASH_CACHE_RACY_NS = 2_000_000_000
+
+# Seconds before the IPs of an allowed host are looked up again
+RESOLVED_HOST_TTL = 60.0
+
 # Events that are info-only (never blocked, always logged for security awareness)
 INFO_ONLY_EVENTS = frozenset(
     {
@@ -278,10 +315,55 @@ SENSITIVE_ENV_VARS = [
     "TOKEN",
 ]
 
+# Set forms of the env var lists above for O(1) membership tests
+_SENSITIVE_ENV_VAR_SET = frozenset(SENSITIVE_ENV_VARS)
+_SAFE_ENV_VAR_SET = frozenset(LIST_VARIABLES["$SAFE_ENV_VARS"])
+
 # Localhost addresses for fast lookup
 LOCALHOST_ADDRESSES = frozenset({"localhost", "127.0.0.1", "::1"})
 
 
+def _compile_globs(patterns: list[str]) -> Callable[[str], object] | None:
+    """Compile glob patterns into a single regex match function.
+
+    The result matches a (normcased) string if fnmatch.fnmatch would match
+    it against any of the patterns. Returns None for an empty list.
+    """
+    if not patterns:
+        return None
+    regex = "|".join(fnmatch.translate(os.path.normcase(p)) for p in patterns)
+    return re.compile(regex).match
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check if a process with this pid exists."""
+    if sys.platform == "win32":
+        return True  # os.kill() would terminate it; assume alive
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, but owned by another user
+    return True
+
+
+def _sha256_file(path: Path) -> str:
+    """Return the SHA256 hex digest of a file, read in chunks.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        buf = memoryview(bytearray(1 << 18))
+        while n := f.readinto(buf):
+            digest.update(buf[:n])
+        return digest.hexdigest()
+
+
 def is_localhost(host: str) -> bool:
     """Check if host is a localhost address (hostname or IP)."""
     return host in LOCALHOST_ADDRESSES
@@ -308,8 +390,23 @@ class BoxEngine:
         self.workdir = Path(workdir) if workdir else Path.cwd()
         self.config = self._load_config()
         self._decisions: list[dict[str, Any]] = []
+        self._pending_keys: set[tuple] = set()  # See record_decision
         self._resolved_ips: set[str] = set()  # IPs resolved from allowed domains
         self._in_resolution = False  # Guard against recursive DNS resolution
+        self._resolved_hosts: dict[str, float] = {}  # Host -> time of last lookup
+        self._allowed_cache: set[tuple] = set()  # See CACHEABLE_EVENTS
+        self._journal_path: Path | None = None  # See enable_decision_journal
+        self._journal_fd: int | None = None
+        self._hash_cache: dict[str, tuple] = {}  # See _file_digest
+        self._sensitive: tuple | None = None  # See _is_sensitive_path
+        # Permission check per event; the config lists they read are
+        # compiled on first use through _get_compiled
+        self._event_checks = self._build_event_checks()
+        # Resolved once per engine; see _get_path_variable_mappings
+        self._path_mappings: list[tuple[str, str]] | None = None
+        self._path_variables: dict[str, str] | None = None
+        # Compiled config lists; see _get_compiled
+        self._compiled_lists: dict[tuple, tuple] = {}
 
     def _default_config(self) -> dict[str, Any]:
         """Return default configuration with pip-friendly permissions.
@@ -384,12 +481,16 @@ class BoxEngine:
         when converting paths to variables.
 
         All paths are resolved to handle symlinks (e.g., /var -> /private/var on macOS).
+        They are resolved once per engine, so changes the sandboxed code makes
+        to the environment (e.g. HOME) do not move the allowed locations.
         """
+        if self._path_mappings is not None:
+            return self._path_mappings
 
         def resolve(p: str) -> str:
             return str(Path(p).resolve()) if p else ""
 
-        return [
+        self._path_mappings = [
             # Python ecosystem (most specific)
             (resolve(self._get_pip_cache()), "$PIP_CACHE"),
             (resolve(os.environ.get("VIRTUAL_ENV", "")), "$VENV"),
@@ -404,6 +505,7 @@ class BoxEngine:
             (resolve(tempfile.gettempdir()), "$TMPDIR"),
             (resolve(os.path.expanduser("~")), "$HOME"),
         ]
+        return self._path_mappings
 
     def _expand_path_variables(self, path: str) -> str:
         """Expand variables in a path string.
@@ -417,7 +519,11 @@ class BoxEngine:
             return path
 
         # Build dict from shared mappings (reversed: var -> path)
-        variables = {var: value for value, var in self._get_path_variable_mappings()}
+        variables = self._path_variables
+        if variables is None:
+            mappings = self._get_path_variable_mappings()
+            variables = {var: value for value, var in mappings}
+            self._path_variables = variables
 
         result = path
         for var, value in variables.items():
@@ -480,17 +586,31 @@ class BoxEngine:
 
         Sensitive paths are always blocked, even if they match an allow rule.
         """
+        if self._sensitive is None:
+            self._sensitive = self._compile_sensitive_paths()
+        exact, prefixes, glob_match = self._sensitive
+
         path_str = str(path)
+        # Handle exact paths and directory prefixes
+        if path_str in exact or path_str.startswith(prefixes):
+            return True
+        # Handle glob patterns
+        if glob_match is None:
+            return False
+        return glob_match(os.path.normcase(path_str)) is not None
+
+    def _compile_sensitive_paths(self) -> tuple:
+        """Expand SENSITIVE_PATHS into (exact paths, dir prefixes, glob matcher)."""
+        exact = set()
+        globs = []
         for sensitive in SENSITIVE_PATHS:
             expanded = self._expand_path_variables(sensitive)
-            # Handle glob patterns
             if "*" in expanded:
-                if fnmatch.fnmatch(path_str, expanded):
-                    return True
-            # Handle directory prefixes
-            elif path_str == expanded or path_str.startswith(expanded + os.sep):
-                return True
-        return False
+                globs.append(expanded)
+            else:
+                exact.add(expanded)
+        prefixes = tuple(e + os.sep for e in exact)
+        return frozenset(exact), prefixes, _compile_globs(globs)
 
     def _is_sensitive_env_var(self, var_name: str) -> bool:
         """Check if an environment variable is in the sensitive list.
@@ -500,7 +620,7 @@ class BoxEngine:
         # Handle bytes
         if isinstance(var_name, bytes):
             var_name = var_name.decode("utf-8", errors="replace")
-        return var_name in SENSITIVE_ENV_VARS
+        return var_name in _SENSITIVE_ENV_VAR_SET
 
     def classify_env_var(self, var_name: str | bytes) -> str:
         """Classify how an env var read should be handled.
@@ -522,8 +642,7 @@ class BoxEngine:
             return "block"
 
         # Safe vars silently allowed
-        safe_vars = LIST_VARIABLES.get("$SAFE_ENV_VARS", [])
-        if var_name in safe_vars:
+        if var_name in _SAFE_ENV_VAR_SET:
             return "silent"
 
         # Non-sensitive vars logged as info
@@ -556,13 +675,10 @@ class BoxEngine:
         """
         if not expected_hash.startswith("sha256:"):
             return False
-        if not path.exists():
-            return False
         try:
             expected = expected_hash[7:]
-            actual = hashlib.sha256(path.read_bytes()).hexdigest()
-            return actual == expected
-        except OSError:
+            return self._file_digest(path) == expected
+        except OSError:  # Includes a missing file
             return False
 
     def _compute_file_hash(self, path: Path) -> str | None:
@@ -571,38 +687,56 @@ class BoxEngine:
         Returns hash in format "sha256:<hexdigest>" or None if file can't be read.
         """
         try:
-            digest = hashlib.sha256(path.read_bytes()).hexdigest()
-            return f"sha256:{digest}"
+            return f"sha256:{self._file_digest(path)}"
         except OSError:
             return None
 
-    def _check_path_in_list(
-        self, path: Path, entries: list, check_hash: bool = False
-    ) -> bool:
-        """Check if a path matches any entry in the list.
+    def _file_digest(self, path: Path) -> str:
+        """Return the SHA256 hex digest of a file, reusing earlier results.
 
-        Args:
-            path: Resolved absolute path to check.
-            entries: List of path strings or dicts with path/hash.
-            check_hash: If True, verify hash for entries that have one.
+        A digest is reused while the file's inode, size, mtime and ctime are
+        unchanged. ctime cannot be set from user space, so restoring mtime
+        after an edit does not revive a stale digest. Recently modified
+        files are not cached (see HASH_CACHE_RACY_NS).
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        st = os.stat(path)
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        cached = self._hash_cache.get(str(path))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        digest = _sha256_file(path)
+        if time.time_ns() - max(st.st_mtime_ns, st.st_ctime_ns) > HASH_CACHE_RACY_NS:
+            self._hash_cache[str(path)] = (key, digest)
+        return digest
+
+    def _compile_path_list(self, config_key: str, check_hash: bool) -> tuple:
+        """Expand and resolve a path allow list.
 
         Returns:
-            True if path is allowed.
+            (exact, globs, dirs). exact maps each resolved entry to its hash
+            and a matcher for the glob entries listed before it, which win
+            over a hash mismatch as they would in a scan in config order.
+            globs matches any glob entry, and dirs is the set of every entry
+            resolved as a directory.
         """
-        path_str = str(path)
-        for entry in entries:
+        exact = {}
+        patterns = []
+        earlier_globs = {}  # Number of leading patterns -> their matcher
+        dirs = set()
+        for entry in self._expand_config_list(config_key):
             entry_path, entry_hash = self._normalize_entry(entry)
+            resolved_entry = self._resolve_path(entry_path)
+            dirs.add(resolved_entry)
 
             # Handle glob patterns (e.g., "*", "/usr/bin/*", "$PWD/.venv/bin/*")
             if "*" in entry_path or "?" in entry_path:
-                expanded = self._expand_path_variables(entry_path)
-                if fnmatch.fnmatch(path_str, expanded):
-                    # Glob matches don't support hash verification
-                    return True
+                patterns.append(self._expand_path_variables(entry_path))
                 continue
 
-            resolved_entry = self._resolve_path(entry_path)
-
             # For executable checks, also try resolving via PATH lookup
             # This handles entries like "git" matching "/usr/bin/git"
             if check_hash and not os.path.isabs(entry_path):
@@ -610,52 +744,114 @@ class BoxEngine:
                 if exe_resolved is not None:
                     resolved_entry = exe_resolved
 
-            if path == resolved_entry:
-                if check_hash and entry_hash:
-                    return self._verify_file_hash(path, entry_hash)
-                return True
-        return False
+            if resolved_entry in exact:
+                continue  # The first entry for a path decides
+            earlier = None
+            if entry_hash and patterns:
+                count = len(patterns)
+                if count not in earlier_globs:
+                    earlier_globs[count] = _compile_globs(patterns)
+                earlier = earlier_globs[count]
+            exact[resolved_entry] = (entry_hash, earlier)
+        return exact, _compile_globs(patterns), frozenset(dirs)
+
+    def _get_compiled(self, cache_key: tuple, config_key: str, build: Callable):
+        """Return build() for the config list at config_key, cached under cache_key.
+
+        Expanding and resolving config entries is done once rather than for
+        every audited event. The result is rebuilt if the config list is
+        replaced or grows.
+        """
+        source = self.config.get(config_key, [])
+        cached = self._compiled_lists.get(cache_key)
+        if cached is not None and cached[0] is source and cached[1] == len(source):
+            return cached[2]
+        compiled = build()
+        self._compiled_lists[cache_key] = (source, len(source), compiled)
+        return compiled
+
+    def _get_path_list(self, config_key: str, check_hash: bool) -> tuple:
+        """Return the compiled path allow list (see _compile_path_list)."""
+        return self._get_compiled(
+            ("paths", config_key, check_hash),
+            config_key,
+            lambda: self._compile_path_list(config_key, check_hash),
+        )
+
+    def _get_value_set(self, config_key: str) -> frozenset:
+        """Return the expanded string entries of a config list as a set."""
+        return self._get_compiled(
+            ("values", config_key),
+            config_key,
+            lambda: frozenset(
+                e for e in self._expand_config_list(config_key) if isinstance(e, str)
+            ),
+        )
+
+    def _check_path_in_list(
+        self,
+        path: Path,
+        exact: dict,
+        globs: Callable[[str], object] | None,
+        check_hash: bool = False,
+    ) -> bool:
+        """Check if a path matches any entry in the list.
 
-    def _check_path_in_dir_list(self, path: Path, dirs: list) -> bool:
-        """Check if a path is within any directory in the list.
+        Args:
+            path: Resolved absolute path to check.
+            exact: Resolved entries from _compile_path_list.
+            globs: Glob matcher from _compile_path_list, or None.
+            check_hash: If True, verify hash for entries that have one.
+
+        Returns:
+            True if path is allowed.
+        """
+        found = exact.get(path)
+        if found is None:
+            return globs is not None and globs(os.path.normcase(path)) is not None
+
+        entry_hash, earlier_globs = found
+        if not (check_hash and entry_hash):
+            return True
+        # Glob matches don't support hash verification
+        if earlier_globs is not None and earlier_globs(os.path.normcase(path)):
+            return True
+        return self._verify_file_hash(path, entry_hash)
+
+    def _check_path_in_dir_list(self, path: Path, dirs: frozenset[Path]) -> bool:
+        """Check if a path is within any directory in the set.
 
         Args:
             path: Resolved absolute path to check.
-            dirs: List of directory paths (strings or dicts with 'path' key).
+            dirs: Resolved directory paths.
 
         Returns:
             True if path is within any allowed directory (not equal to).
         """
-        for dir_entry in dirs:
-            entry_path, _ = self._normalize_entry(dir_entry)
-            dir_path = self._resolve_path(entry_path)
-            try:
-                rel = path.relative_to(dir_path)
-                # Only allow if path is INSIDE the directory, not equal to it
-                if rel != Path("."):
-                    return True
-            except ValueError:
-                continue
-        return False
+        # Look up the path's ancestors instead of trying every directory.
+        # parents excludes the path itself, so a directory entry never
+        # matches itself.
+        return not dirs.isdisjoint(path.parents)
 
     def _check_path_permission(
-        self, path: Path, allow_list: list, check_hash: bool = False
+        self, path: Path, config_key: str, check_hash: bool = False
     ) -> bool:
         """Check if a path is permitted by an allow list.
 
         Args:
             path: Resolved absolute path to check.
-            allow_list: List of allowed paths (files or directories).
+            config_key: Config key of the allow list (files or directories).
             check_hash: If True, verify hash for entries that have one.
 
         Returns:
             True if path is allowed.
         """
+        exact, globs, dirs = self._get_path_list(config_key, check_hash)
         # Check exact file match
-        if self._check_path_in_list(path, allow_list, check_hash=check_hash):
+        if self._check_path_in_list(path, exact, globs, check_hash=check_hash):
             return True
         # Check if path is within an allowed directory
-        return self._check_path_in_dir_list(path, allow_list)
+        return self._check_path_in_dir_list(path, dirs)
 
     def _check_file_permission(
         self,
@@ -677,9 +873,7 @@ class BoxEngine:
         """
         if check_sensitive and self._is_sensitive_path(path):
             return False
-        return self._check_path_permission(
-            path, self._expand_config_list(config_key), check_hash=check_hash
-        )
+        return self._check_path_permission(path, config_key, check_hash=check_hash)
 
     def _check_read_permission(self, path: Path) -> bool:
         """Check if reading a file is permitted."""
@@ -736,12 +930,8 @@ class BoxEngine:
         resolved = self._resolve_path(path_arg)
 
         # Determine operation type from mode
-        # w=write, a=append, x=exclusive create, +=read/write
-        # Note: 'b' is binary mode (not write), 'r' is read
-        is_write = any(c in str(mode) for c in "wax+")
-
-        if is_write:
-            is_new_file = not resolved.exists()
+        if _is_write_mode(mode):
+            is_new_file = not os.path.exists(resolved)
             if is_new_file:
                 return self._check_create_permission(resolved)
             else:
@@ -798,15 +988,16 @@ class BoxEngine:
         if executable is None:
             return True  # Can't determine executable, allow
 
-        allow_list = self._expand_config_list("allow_executables")
-        if not allow_list:
+        if not self.config.get("allow_executables"):
             return False  # Empty list = block all executables
 
         exe_path = self._resolve_executable(executable)
         if exe_path is None:
             return False  # Can't resolve = block
 
-        return self._check_path_permission(exe_path, allow_list, check_hash=True)
+        return self._check_path_permission(
+            exe_path, "allow_executables", check_hash=True
+        )
 
     def _check_shell_command(self, event: str, args: tuple) -> bool:
         """Check shell command execution permission."""
@@ -828,10 +1019,12 @@ class BoxEngine:
             return True
 
         # Check against allowed patterns using glob matching
-        for pattern in self.config.get("allow_shell_commands", []):
-            if fnmatch.fnmatch(command, pattern):
-                return True
-        return False
+        matcher = self._get_compiled(
+            ("glob", "allow_shell_commands"),
+            "allow_shell_commands",
+            lambda: _compile_globs(self.config.get("allow_shell_commands", [])),
+        )
+        return matcher is not None and matcher(os.path.normcase(command)) is not None
 
     def _parse_domain_entry(self, entry: str) -> tuple[str, int | None]:
         """Parse a domain entry which may include a port.
@@ -874,35 +1067,58 @@ class BoxEngine:
             return True
 
         # Check allowed domains (expand variables like $PYPI_DOMAINS)
+        domains = self._get_compiled(
+            ("domains", "allow_domains"), "allow_domains", self._compile_domains
+        )
+        # Look up the host and each parent domain, so an entry matches
+        # itself and its subdomains. DNS names are case-insensitive.
+        candidate = host.lower()
+        while True:
+            ports = domains.get(candidate)
+            # None in ports: an entry without a port allows any port
+            if ports is not None and (None in ports or port is None or port in ports):
+                self._cache_resolved_ips(host, port)
+                return True
+            dot = candidate.find(".")
+            if dot == -1:
+                break
+            candidate = candidate[dot + 1 :]
+
+        # An IP literal needs no lookup, and connecting to it is checked
+        # against allow_ips. gethostbyname_ex and gethostbyaddr still do a
+        # reverse lookup, so they stay restricted to allowed domains.
+        return event in NUMERIC_HOST_EVENTS and self._is_ip_address(host)
+
+    def _compile_domains(self) -> dict[str, frozenset]:
+        """Map each allowed domain to the ports allowed for it (None = any)."""
+        domains: dict[str, set] = {}
         for entry in self._expand_config_list("allow_domains"):
             allowed_domain, allowed_port = self._parse_domain_entry(entry)
-
-            if host == allowed_domain or host.endswith("." + allowed_domain):
-                # If entry specifies a port, check it matches
-                if allowed_port is not None:
-                    if port is None or port == allowed_port:
-                        self._cache_resolved_ips(host, port)
-                        return True
-                else:
-                    # No port specified - any port allowed
-                    self._cache_resolved_ips(host, port)
-                    return True
-
-        return False
+            domains.setdefault(allowed_domain.lower(), set()).add(allowed_port)
+        return {domain: frozenset(ports) for domain, ports in domains.items()}
 
     def _cache_resolved_ips(self, domain: str, port: int | None) -> None:
         """Resolve and cache IPs for an allowed domain.
 
         Uses a recursion guard since DNS resolution triggers audit events.
+        The addresses don't depend on the port, so a host looked up less
+        than RESOLVED_HOST_TTL seconds ago is not looked up again.
         """
         if self._in_resolution:
             return
 
+        host = domain.lower()
+        now = time.monotonic()
+        resolved_at = self._resolved_hosts.get(host)
+        if resolved_at is not None and now - resolved_at < RESOLVED_HOST_TTL:
+            return
+
         self._in_resolution = True
         try:
             results = socket.getaddrinfo(domain, port or 443, proto=socket.IPPROTO_TCP)
             for _family, _type, _proto, _canonname, sockaddr in results:
                 self._resolved_ips.add(sockaddr[0])
+            self._resolved_hosts[host] = now
         except socket.gaierror:
             pass  # DNS resolution failed, nothing to cache
         finally:
@@ -958,22 +1174,35 @@ class BoxEngine:
             return False
 
         # Check static allow_ips config (expand variables like $LOCALHOST)
-        for entry in self._expand_config_list("allow_ips"):
-            allowed_ip, allowed_port = self._parse_ip_entry(entry)
+        rules = self._get_compiled(
+            ("ips", "allow_ips"), "allow_ips", self._compile_ip_rules
+        )
+        for network, allowed_port in rules:
             if allowed_port is not None and port != allowed_port:
                 continue
             # Handle "localhost" hostname
-            if allowed_ip == "localhost":
+            if network == "localhost":
                 if is_localhost(ip):
                     return True
                 continue
+            if ip_obj in network:
+                return True
+        return False
+
+    def _compile_ip_rules(self) -> list[tuple]:
+        """Parse allow_ips into (network or "localhost", port or None) rules."""
+        rules = []
+        for entry in self._expand_config_list("allow_ips"):
+            allowed_ip, allowed_port = self._parse_ip_entry(entry)
+            if allowed_ip == "localhost":
+                rules.append(("localhost", allowed_port))
+                continue
             try:
                 network = ipaddress.ip_network(allowed_ip, strict=False)
-                if ip_obj in network:
-                    return True
             except ValueError:
-                continue
-        return False
+                continue  # Invalid entries never match
+            rules.append((network, allowed_port))
+        return rules
 
     def _check_socket_connect(self, args: tuple) -> bool:
         """Check if socket connection is permitted."""
@@ -1018,43 +1247,54 @@ class BoxEngine:
         # Normalize URL - add scheme if missing
         if "://" not in url:
             url = f"https://{url}"
-        parsed_url = urlparse(url)
+        return self._url_matches_parsed(urlparse(url), self._parse_url_pattern(pattern))
+
+    def _parse_url_pattern(self, pattern: str) -> tuple:
+        """Parse a URL pattern for _url_matches_parsed.
 
+        Returns:
+            (scheme or None, host, port or None, path matcher, match_query)
+        """
         # Normalize pattern - add scheme if missing
         pattern_has_scheme = "://" in pattern
         if not pattern_has_scheme:
             pattern = f"https://{pattern}"
         parsed_pattern = urlparse(pattern)
 
+        # Handle query string in pattern
+        path_glob = parsed_pattern.path or "/"
+        if parsed_pattern.query:
+            path_glob = f"{path_glob}?{parsed_pattern.query}"
+
+        return (
+            parsed_pattern.scheme if pattern_has_scheme else None,
+            parsed_pattern.hostname or "",
+            parsed_pattern.port,
+            _compile_globs([path_glob]),
+            bool(parsed_pattern.query),
+        )
+
+    def _url_matches_parsed(self, parsed_url, url_pattern: tuple) -> bool:
+        """Match a urlparse() result against a pattern from _parse_url_pattern."""
+        scheme, pattern_host, port, path_matcher, match_query = url_pattern
+
         # If pattern has explicit scheme, it must match
-        if pattern_has_scheme and parsed_url.scheme != parsed_pattern.scheme:
+        if scheme is not None and parsed_url.scheme != scheme:
             return False
 
-        # Extract host (without port) for comparison
-        url_host = parsed_url.hostname or ""
-        pattern_host = parsed_pattern.hostname or ""
-
         # Domain must match (exact or subdomain)
-        if not self._domain_matches(url_host, pattern_host):
+        if not self._domain_matches(parsed_url.hostname or "", pattern_host):
             return False
 
         # Port must match if pattern specifies one
-        if parsed_pattern.port is not None and parsed_url.port != parsed_pattern.port:
+        if port is not None and parsed_url.port != port:
             return False
 
         # Path must match (glob pattern)
         url_path = parsed_url.path or "/"
-        pattern_path = parsed_pattern.path or "/"
-
-        # Handle query string in pattern
-        if parsed_pattern.query:
-            url_full_path = (
-                f"{url_path}?{parsed_url.query}" if parsed_url.query else url_path
-            )
-            pattern_full_path = f"{pattern_path}?{parsed_pattern.query}"
-            return fnmatch.fnmatch(url_full_path, pattern_full_path)
-
-        return fnmatch.fnmatch(url_path, pattern_path)
+        if match_query and parsed_url.query:
+            url_path = f"{url_path}?{parsed_url.query}"
+        return path_matcher(os.path.normcase(url_path)) is not None
 
     def _check_url_request(self, args: tuple) -> bool:
         """Check if URL request is permitted.
@@ -1082,20 +1322,32 @@ class BoxEngine:
         # Check HTTP method restrictions (expand variables like $ALL_HTTP_METHODS)
         method = args[3] if len(args) > 3 else (args[1] if len(args) > 1 else None)
         if isinstance(method, str):
-            allowed_methods = self._expand_config_list("allow_http_methods")
+            allowed_methods = self._get_compiled(
+                ("methods", "allow_http_methods"),
+                "allow_http_methods",
+                lambda: frozenset(
+                    m.upper() for m in self._expand_config_list("allow_http_methods")
+                ),
+            )
             if not allowed_methods:
                 return False  # Empty = block all methods
-            upper_allowed = [m.upper() for m in allowed_methods]
-            if method.upper() not in upper_allowed:
+            if method.upper() not in allowed_methods:
                 return False
 
         # Check URL patterns (expand variables like $PYPI_DOMAINS/*)
-        allow_urls = self._expand_config_list("allow_http_urls")
-        if not allow_urls:
+        url_patterns = self._get_compiled(
+            ("urls", "allow_http_urls"),
+            "allow_http_urls",
+            lambda: [
+                self._parse_url_pattern(pattern)
+                for pattern in self._expand_config_list("allow_http_urls")
+            ],
+        )
+        if not url_patterns:
             return False  # Empty = block all URLs
 
         # Check against URL patterns
-        return any(self._url_matches_pattern(url, pattern) for pattern in allow_urls)
+        return any(self._url_matches_parsed(parsed, p) for p in url_patterns)
 
     def _check_http_request(self, args: tuple) -> bool:
         """Check if HTTP request is permitted.
@@ -1111,6 +1363,9 @@ class BoxEngine:
     def check_permission(self, event: str, args: tuple) -> bool:
         """Check if an audit event is permitted.
 
+        Allowed events in CACHEABLE_EVENTS are remembered, so repeats skip
+        the config walk. Denials are never cached.
+
         Args:
             event: The audit event name.
             args: The event arguments.
@@ -1118,41 +1373,69 @@ class BoxEngine:
         Returns:
             True if the event is allowed, False otherwise.
         """
-        # Map events to handlers
-        if event == "open":
-            return self._check_file_access(args)
-        elif event in ("os.remove", "os.unlink"):
-            return self._check_file_delete(args)
-        elif event in ("os.getenv", "os.environ.get"):
-            return self._check_env_read(args)
-        elif event in EXEC_EVENTS:
-            # Check binary execution permission first
-            if not self._check_executable(event, args):
-                return False
-            # Also check shell command patterns for subprocess.Popen
-            if event in SHELL_EVENTS:
-                return self._check_shell_command(event, args)
+        if event not in CACHEABLE_EVENTS:
+            return self._check_permission(event, args)
+
+        key = (
+            event,
+            tuple(a if isinstance(a, _CACHE_KEY_TYPES) else repr(a) for a in args),
+        )
+        if key in self._allowed_cache:
             return True
-        elif event == "os.system":
+
+        allowed = self._check_permission(event, args)
+        if allowed:
+            if len(self._allowed_cache) >= PERMISSION_CACHE_SIZE:
+                self._allowed_cache.clear()
+            self._allowed_cache.add(key)
+        return allowed
+
+    def _check_permission(self, event: str, args: tuple) -> bool:
+        """Check an audit event against the config without caching."""
+        check = self._event_checks.get(event)
+        if check is None:
+            # Events not explicitly handled are allowed
+            return True
+        return check(event, args)
+
+    def _build_event_checks(self) -> dict[str, Callable[[str, tuple], bool]]:
+        """Map each handled event to its permission check, called as (event, args)."""
+
+        def args_only(check: Callable[[tuple], bool]):
+            return lambda event, args: check(args)
+
+        checks = {
+            "open": args_only(self._check_file_access),
+            "os.remove": args_only(self._check_file_delete),
+            "os.unlink": args_only(self._check_file_delete),
+            "os.getenv": args_only(self._check_env_read),
+            "os.environ.get": args_only(self._check_env_read),
             # os.system only checks shell commands (no binary path to verify)
-            return self._check_shell_command(event, args)
-        elif event == "socket.connect":
-            return self._check_socket_connect(args)
-        elif event in (
+            "os.system": self._check_shell_command,
+            "socket.connect": args_only(self._check_socket_connect),
+            "urllib.Request": args_only(self._check_url_request),
+            "http.request": args_only(self._check_http_request),
+            "socket.__new__": args_only(self._check_raw_socket),
+        }
+        for event in EXEC_EVENTS:
+            checks[event] = self._check_exec
+        for event in (
             "socket.getaddrinfo",
             "socket.gethostbyname",
             "socket.gethostbyname_ex",
             "socket.gethostbyaddr",
         ):
-            return self._check_domain(args, event)
-        elif event == "urllib.Request":
-            return self._check_url_request(args)
-        elif event == "http.request":
-            return self._check_http_request(args)
-        elif event == "socket.__new__":
-            return self._check_raw_socket(args)
-
-        # Events not explicitly handled are allowed
+            checks[event] = lambda event, args: self._check_domain(args, event)
+        return checks
+
+    def _check_exec(self, event: str, args: tuple) -> bool:
+        """Check an event in EXEC_EVENTS."""
+        # Check binary execution permission first
+        if not self._check_executable(event, args):
+            return False
+        # Also check shell command patterns for subprocess.Popen
+        if event in SHELL_EVENTS:
+            return self._check_shell_command(event, args)
         return True
 
     def _check_raw_socket(self, args: tuple) -> bool:
@@ -1191,13 +1474,109 @@ class BoxEngine:
             allowed: Whether the user allowed this event.
             details: Optional additional details about the decision.
         """
+        details = details or {}
+        # The config entry is derived from event and details only, so a
+        # decision repeating a pending one would save nothing new
+        key = (event, allowed, repr(sorted(details.items())))
+        if key in self._pending_keys:
+            return
+        self._pending_keys.add(key)
+
         decision = {
             "event": event,
-            "args": repr(args),
+            "args": _args_repr(args),
             "allowed": allowed,
-            "details": details or {},
+            "details": details,
         }
         self._decisions.append(decision)
+        # Recording leaves self.config untouched, so compiled lists stay valid
+        self._allowed_cache.clear()
+        if self._journal_path is not None:
+            self._append_to_journal(decision)
+
+    def enable_decision_journal(self) -> None:
+        """Journal recorded decisions in the user's cache directory.
+
+        Each decision is appended as one JSON line as soon as it is recorded,
+        so approvals survive a crash or os._exit() before save_decisions()
+        runs. Every process writes its own <config digest>.<pid>, as
+        sandboxed parents and children review against the same config.
+        Journals left by processes that are gone are merged into the config
+        here without a prompt, so they are kept in a private per-user
+        directory rather than next to the config, where sandboxed code is
+        usually allowed to create files.
+        """
+        import json
+
+        from malwi_box.wrapper import _private_cache_dir
+
+        journal_dir = _private_cache_dir("journal")
+        if journal_dir is None:
+            return  # Decisions are still saved by save_decisions()
+
+        config_key = os.path.abspath(self.config_path).encode()
+        prefix = hashlib.blake2b(config_key, digest_size=8).hexdigest() + "."
+        pid = os.getpid()
+        self._journal_path = journal_dir / f"{prefix}{pid}"
+
+        try:
+            names = os.listdir(self._journal_path.parent)
+        except OSError:
+            names = []
+
+        leftovers = []
+        for name in names:
+            owner = name[len(prefix) :]
+            if not name.startswith(prefix) or not owner.isdigit():
+                continue
+            if int(owner) != pid and _pid_alive(int(owner)):
+                continue  # Still being written by a live session
+            path = self._journal_path.with_name(name)
+            try:
+                with open(path) as f:
+                    lines = f.readlines()
+            except OSError as e:
+                sys.stderr.write(f"[malwi-box] Warning: Could not read journal: {e}\n")
+                continue
+            leftovers.append(path)
+
+            for line in lines:
+                try:
+                    decision = json.loads(line)
+                except ValueError:
+                    continue  # Torn write from an interrupted session
+                if isinstance(decision, dict) and "event" in decision:
+                    self._decisions.append(decision)
+
+        if self._decisions:
+            self.save_decisions()
+            if self._decisions:
+                return  # Not saved; keep the journals for the next session
+        for path in leftovers:
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+
+    def _append_to_journal(self, decision: dict) -> None:
+        """Append a decision to the journal as a single O_APPEND write."""
+        import json
+
+        line = json.dumps(decision, default=str) + "\n"
+        try:
+            if self._journal_fd is None:
+                self._journal_fd = os.open(
+                    self._journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600
+                )
+            os.write(self._journal_fd, line.encode())
+        except OSError as e:
+            sys.stderr.write(f"[malwi-box] Warning: Could not write journal: {e}\n")
+
+    def _remove_journal(self) -> None:
+        """Remove the journal once its decisions are in the config."""
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+        with contextlib.suppress(OSError):
+            os.unlink(self._journal_path)
 
     def _entry_exists(self, entries: list, path: str) -> bool:
         """Check if path already exists in allow list."""
@@ -1240,13 +1619,27 @@ class BoxEngine:
                 pass
         return self._default_config()
 
-    def _write_config(self, config: dict[str, Any]) -> None:
-        """Write config to file."""
+    def _write_config(self, config: dict[str, Any]) -> bool:
+        """Write config to file. Returns True on success.
+
+        The config is written to a temporary file and renamed over the old
+        one, so sandboxed processes starting concurrently never read a
+        partially written config.
+        """
+        target = os.path.realpath(self.config_path)  # Keep symlinks intact
+        tmp = f"{target}.{os.getpid()}.tmp"
         try:
-            with open(self.config_path, "w") as f:
+            with open(tmp, "w") as f:
                 toml.dump(config, f)
+            if os.path.exists(target):
+                shutil.copymode(target, tmp)
+            os.replace(tmp, target)
         except OSError as e:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
             sys.stderr.write(f"[malwi-box] Warning: Could not save config: {e}\n")
+            return False
+        return True
 
     def _save_file_decision(self, config: dict, decision: dict) -> None:
         """Save a file access decision to config."""
@@ -1257,7 +1650,7 @@ class BoxEngine:
 
         mode = details.get("mode") or "r"
         is_new = details.get("is_new_file", False)
-        is_write = any(c in mode for c in "wax+")
+        is_write = _is_write_mode(mode)
 
         if is_write and is_new:
             key = "allow_create"
@@ -1354,7 +1747,10 @@ class BoxEngine:
             config[key].append(var_path)
 
     def save_decisions(self) -> None:
-        """Merge recorded decisions into config file."""
+        """Merge recorded decisions into config file.
+
+        Saved decisions are cleared, so repeated calls only merge new ones.
+        """
         if not self._decisions:
             return
 
@@ -1383,7 +1779,11 @@ class BoxEngine:
             elif event in ("os.remove", "os.unlink"):
                 self._save_delete_decision(config, decision)
 
-        self._write_config(config)
+        if self._write_config(config):
+            self._decisions.clear()
+            self._pending_keys.clear()
+            if self._journal_path is not None:
+                self._remove_journal()
 
     def _check_env_read(self, args: tuple) -> bool:
         """Check if reading an env var is allowed.
@@ -1405,7 +1805,7 @@ class BoxEngine:
         if self._is_sensitive_env_var(key):
             return False
 
-        allowed = self._expand_config_list("allow_env_var_reads")
+        allowed = self._get_value_set("allow_env_var_reads")
         if not allowed:
             return False  # Empty = block all
 
@@ -1,11 +1,16 @@
 """Formatting utilities for audit events."""
 
 import os
-from pathlib import Path
+import reprlib
+import socket
 
 MAX_VALUE_LEN = 50
 MAX_CMD_LEN = 80
 
+# Abbreviates long strings and containers in repr() of event args
+_ARGS_REPR = reprlib.Repr()
+_ARGS_REPR.maxstring = _ARGS_REPR.maxother = MAX_CMD_LEN
+
 
 def _decode(value) -> str:
     """Decode bytes to string if needed."""
@@ -21,6 +26,27 @@ def _truncate(s: str, max_len: int) -> str:
     return s
 
 
+# open() mode characters that imply writing: w=write, a=append,
+# x=exclusive create, +=read/write ('b' is binary mode, 'r' is read)
+_WRITE_MODE_CHARS = frozenset("wax+")
+
+
+def _is_write_mode(mode) -> bool:
+    """Check if an open() mode opens the file for writing."""
+    return not _WRITE_MODE_CHARS.isdisjoint(
+        mode if isinstance(mode, str) else str(mode)
+    )
+
+
+def _args_repr(args) -> str:
+    """repr() of event args with long strings and containers abbreviated.
+
+    Event args can carry large payloads (argv lists, environments, buffers),
+    so a plain repr() would cost time and log space proportional to them.
+    """
+    return _ARGS_REPR.repr(args)
+
+
 def _build_command(exe, cmd_args) -> str:
     """Build command string from executable and args.
 
@@ -35,192 +61,331 @@ def _build_command(exe, cmd_args) -> str:
         first_base = os.path.basename(first_arg)
         exe_base = os.path.basename(exe_str)
         if first_arg == exe_str or first_base == exe_base:
-            return " ".join(str(a) for a in cmd_args)
+            return " ".join(map(str, cmd_args))
         # Args don't include exe, prepend it
-        return " ".join([exe_str] + [str(a) for a in cmd_args])
+        return f"{exe_str} {' '.join(map(str, cmd_args))}"
     return str(exe)
 
 
+# Per-event formatters for format_event, keyed by event name in _FORMATTERS.
+# Each takes the (non-empty) event args and the truncate flag.
+
+
+def _shorten(s: str, max_len: int, truncate: bool) -> str:
+    return _truncate(s, max_len) if truncate else s
+
+
+def _fmt_open(args: tuple, truncate: bool) -> str:
+    path = _decode(args[0])
+    mode = args[1] if len(args) > 1 else "r"
+    if _is_write_mode(mode):
+        action = "Modify" if os.path.exists(path) else "Create"
+        return f"{action} file: {path}"
+    return f"Read file: {path}"
+
+
+def _fmt_putenv(args: tuple, truncate: bool) -> str:
+    key = _decode(args[0])
+    val = _shorten(_decode(args[1]), MAX_VALUE_LEN, truncate)
+    return f"Set env var: {key}={val}"
+
+
+def _fmt_unsetenv(args: tuple, truncate: bool) -> str:
+    return f"Unset env var: {_decode(args[0])}"
+
+
+def _fmt_delete(args: tuple, truncate: bool) -> str:
+    return f"Delete file: {_decode(args[0])}"
+
+
+def _fmt_getenv(args: tuple, truncate: bool) -> str:
+    return f"Read env var: {_decode(args[0])}"
+
+
+def _fmt_getaddrinfo(args: tuple, truncate: bool) -> str:
+    host = args[0]
+    port = args[1] if len(args) > 1 else ""
+    return f"DNS lookup: {host}:{port}" if port else f"DNS lookup: {host}"
+
+
+def _fmt_dns(args: tuple, truncate: bool) -> str:
+    return f"DNS lookup: {args[0]}"
+
+
+def _fmt_connect(args: tuple, truncate: bool) -> str:
+    # args: (socket, address) where address is (host, port)
+    if len(args) >= 2 and isinstance(args[1], tuple):
+        host = args[1][0]
+        port = args[1][1] if len(args[1]) > 1 else None
+        if port:
+            return f"Connect: {host}:{port}"
+        return f"Connect: {host}"
+    return f"Connect: {args}"
+
+
+def _fmt_popen(args: tuple, truncate: bool) -> str:
+    cmd_args = args[1] if len(args) > 1 else []
+    cmd = _build_command(args[0], cmd_args)
+    return f"Execute: {_shorten(cmd, MAX_CMD_LEN, truncate)}"
+
+
+def _fmt_system(args: tuple, truncate: bool) -> str:
+    return f"Shell: {_shorten(str(args[0]), MAX_CMD_LEN, truncate)}"
+
+
+def _fmt_exec(args: tuple, truncate: bool) -> str:
+    return f"Exec: {args[0]}"
+
+
+def _fmt_spawn(args: tuple, truncate: bool) -> str:
+    exe = args[1] if len(args) > 1 else "?"
+    return f"Spawn: {exe}"
+
+
+def _fmt_posix_spawn(args: tuple, truncate: bool) -> str:
+    return f"Posix spawn: {args[0]}"
+
+
+def _fmt_dlopen(args: tuple, truncate: bool) -> str:
+    return f"Load library: {args[0]}"
+
+
+def _fmt_urllib_request(args: tuple, truncate: bool) -> str:
+    url = args[0]
+    method = args[3] if len(args) > 3 and args[3] else None
+    if method is None:
+        # Infer method from data presence
+        data = args[1] if len(args) > 1 else None
+        method = "POST" if data else "GET"
+    return f"HTTP {method}: {_shorten(str(url), MAX_CMD_LEN, truncate)}"
+
+
+def _fmt_http_request(args: tuple, truncate: bool) -> str:
+    url = args[0]
+    method = args[1] if len(args) > 1 else "GET"
+    return f"HTTP {method}: {_shorten(str(url), MAX_CMD_LEN, truncate)}"
+
+
+def _fmt_cipher(args: tuple, truncate: bool) -> str:
+    action = "Encrypt" if "encrypt" in str(args[0]) else "Decrypt"
+    return f"Cipher: {action}"
+
+
+def _fmt_pickle(args: tuple, truncate: bool) -> str:
+    cls = args[1] if len(args) > 1 else "?"
+    return f"Pickle: {args[0]}.{cls}"
+
+
+def _fmt_unpack_archive(args: tuple, truncate: bool) -> str:
+    extract_dir = args[1] if len(args) > 1 else "?"
+    fmt = args[2] if len(args) > 2 else "auto"
+    return f"Unpack: {args[0]} -> {extract_dir} ({fmt})"
+
+
+def _fmt_rsa(args: tuple, truncate: bool) -> str:
+    op = args[1] if len(args) > 1 else "?"
+    return f"RSA: {op} ({args[0]} bits)"
+
+
+def _fmt_aes(args: tuple, truncate: bool) -> str:
+    op = args[1] if len(args) > 1 else "?"
+    return f"AES: {op} ({args[0]})"
+
+
+def _fmt_raw_socket(args: tuple, truncate: bool) -> str:
+    # Raw socket creation - args: (family, type, proto)
+    if len(args) >= 2 and args[1] == socket.SOCK_RAW:
+        return "Raw socket creation"
+    return f"Socket: {_args_repr(args)}"
+
+
+def _labeled(label: str):
+    """Create a formatter that prints label followed by the first arg."""
+
+    def fmt(args: tuple, truncate: bool) -> str:
+        return f"{label}: {args[0]}"
+
+    return fmt
+
+
+_FORMATTERS = {
+    "open": _fmt_open,
+    "os.putenv": _fmt_putenv,
+    "os.unsetenv": _fmt_unsetenv,
+    "os.remove": _fmt_delete,
+    "os.unlink": _fmt_delete,
+    "os.getenv": _fmt_getenv,
+    "os.environ.get": _fmt_getenv,
+    "socket.getaddrinfo": _fmt_getaddrinfo,
+    "socket.gethostbyname": _fmt_dns,
+    "socket.gethostbyname_ex": _fmt_dns,
+    "socket.gethostbyaddr": _fmt_dns,
+    "socket.connect": _fmt_connect,
+    "subprocess.Popen": _fmt_popen,
+    "os.system": _fmt_system,
+    "os.exec": _fmt_exec,
+    "os.spawn": _fmt_spawn,
+    "os.posix_spawn": _fmt_posix_spawn,
+    "ctypes.dlopen": _fmt_dlopen,
+    "urllib.Request": _fmt_urllib_request,
+    "http.request": _fmt_http_request,
+    # Info-only events (encoding/crypto)
+    "encoding.base64": _labeled("Base64"),
+    "crypto.cipher": _fmt_cipher,
+    "crypto.fernet": _labeled("Fernet"),
+    # Deserialization events
+    "pickle.find_class": _fmt_pickle,
+    "marshal.loads": lambda args, truncate: "Marshal: loads",
+    # Archive events
+    "shutil.unpack_archive": _fmt_unpack_archive,
+    # Crypto algorithm events
+    "crypto.hmac": _labeled("HMAC"),
+    "crypto.kdf": _labeled("KDF"),
+    "crypto.rsa": _fmt_rsa,
+    "crypto.aes": _fmt_aes,
+    "crypto.chacha20": _labeled("ChaCha20"),
+    # Random events
+    "secrets.token": lambda args, truncate: f"SecureRandom: {args[0]} bytes",
+    # Encoding & compression events
+    "encoding.hex": _labeled("Hex"),
+    "encoding.zlib": _labeled("Zlib"),
+    "encoding.gzip": _labeled("Gzip"),
+    "encoding.bz2": _labeled("Bz2"),
+    "encoding.lzma": _labeled("LZMA"),
+    "socket.__new__": _fmt_raw_socket,
+}
+
+
 def format_event(event: str, args: tuple, truncate: bool = False) -> str:
     """Format audit event for human-readable output."""
-    def shorten(s: str, max_len: int) -> str:
-        return _truncate(s, max_len) if truncate else s
     if not args:
         return f"{event}: {args}"
 
-    if event == "open":
-        path = _decode(args[0])
-        mode = args[1] if len(args) > 1 else "r"
-        is_write = any(c in str(mode) for c in "wax+")
-        if is_write:
-            action = "Create" if not Path(path).exists() else "Modify"
-            return f"{action} file: {path}"
-        return f"Read file: {path}"
-
-    if event == "os.putenv":
-        key = _decode(args[0])
-        val = shorten(_decode(args[1]), MAX_VALUE_LEN)
-        return f"Set env var: {key}={val}"
-
-    if event == "os.unsetenv":
-        return f"Unset env var: {_decode(args[0])}"
-
-    if event in ("os.remove", "os.unlink"):
-        path = _decode(args[0])
-        return f"Delete file: {path}"
-
-    if event in ("os.getenv", "os.environ.get"):
-        key = _decode(args[0])
-        return f"Read env var: {key}"
-
-    if event == "socket.getaddrinfo":
-        host = args[0]
-        port = args[1] if len(args) > 1 else ""
-        return f"DNS lookup: {host}:{port}" if port else f"DNS lookup: {host}"
-
-    if event == "socket.gethostbyname":
-        return f"DNS lookup: {args[0]}"
-
-    if event in ("socket.gethostbyname_ex", "socket.gethostbyaddr"):
-        return f"DNS lookup: {args[0]}"
-
-    if event == "socket.connect":
-        # args: (socket, address) where address is (host, port)
-        if len(args) >= 2 and isinstance(args[1], tuple):
-            host = args[1][0]
-            port = args[1][1] if len(args[1]) > 1 else None
-            if port:
-                return f"Connect: {host}:{port}"
-            return f"Connect: {host}"
-        return f"Connect: {args}"
-
-    if event == "subprocess.Popen":
-        cmd_args = args[1] if len(args) > 1 else []
-        cmd = _build_command(args[0], cmd_args)
-        return f"Execute: {shorten(cmd, MAX_CMD_LEN)}"
-
-    if event == "os.system":
-        cmd = str(args[0])
-        return f"Shell: {shorten(cmd, MAX_CMD_LEN)}"
-
-    if event == "os.exec":
-        exe = args[0] if args else "?"
-        return f"Exec: {exe}"
-
-    if event == "os.spawn":
-        exe = args[1] if len(args) > 1 else "?"
-        return f"Spawn: {exe}"
-
-    if event == "os.posix_spawn":
-        exe = args[0] if args else "?"
-        return f"Posix spawn: {exe}"
-
-    if event == "ctypes.dlopen":
-        lib = args[0] if args else "?"
-        return f"Load library: {lib}"
-
-    if event == "urllib.Request":
-        url = args[0] if args else "?"
-        method = args[3] if len(args) > 3 and args[3] else None
-        if method is None:
-            # Infer method from data presence
-            data = args[1] if len(args) > 1 else None
-            method = "POST" if data else "GET"
-        return f"HTTP {method}: {shorten(str(url), MAX_CMD_LEN)}"
-
-    if event == "http.request":
-        url = args[0] if args else "?"
-        method = args[1] if len(args) > 1 else "GET"
-        return f"HTTP {method}: {shorten(str(url), MAX_CMD_LEN)}"
+    formatter = _FORMATTERS.get(event)
+    if formatter is not None:
+        return formatter(args, truncate)
+    return f"{event}: {_args_repr(args)}"
 
-    # Info-only events (encoding/crypto)
-    if event == "encoding.base64":
-        operation = args[0] if args else "unknown"
-        return f"Base64: {operation}"
 
-    if event == "crypto.cipher":
-        operation = args[0] if args else "unknown"
-        action = "Encrypt" if "encrypt" in str(operation) else "Decrypt"
-        return f"Cipher: {action}"
+# Per-event detail extractors for extract_decision_details, keyed by event
+# name in _DETAIL_EXTRACTORS. Each takes the (non-empty) event args.
 
-    if event == "crypto.fernet":
-        operation = args[0] if args else "unknown"
-        return f"Fernet: {operation}"
 
-    # Deserialization events
-    if event == "pickle.find_class":
-        module = args[0] if args else "?"
-        cls = args[1] if len(args) > 1 else "?"
-        return f"Pickle: {module}.{cls}"
+def _details_open(args: tuple) -> dict:
+    return {
+        "path": str(args[0]),
+        "mode": args[1] if len(args) > 1 and args[1] is not None else "r",
+        "is_new_file": not os.path.exists(args[0]),
+    }
 
-    if event == "marshal.loads":
-        return "Marshal: loads"
 
-    # Archive events
-    if event == "shutil.unpack_archive":
-        filename = args[0] if args else "?"
-        extract_dir = args[1] if len(args) > 1 else "?"
-        fmt = args[2] if len(args) > 2 else "auto"
-        return f"Unpack: {filename} -> {extract_dir} ({fmt})"
+def _details_system(args: tuple) -> dict:
+    return {"command": str(args[0])}
 
-    # Crypto algorithm events
-    if event == "crypto.hmac":
-        algo = args[0] if args else "?"
-        return f"HMAC: {algo}"
 
-    if event == "crypto.kdf":
-        algo = args[0] if args else "?"
-        return f"KDF: {algo}"
+def _details_popen(args: tuple) -> dict:
+    cmd_args = args[1] if len(args) > 1 else []
+    return {
+        "command": _build_command(args[0], cmd_args),
+        "executable": str(args[0]) if args[0] else "",
+    }
 
-    if event == "crypto.rsa":
-        key_size = args[0] if args else "?"
-        op = args[1] if len(args) > 1 else "?"
-        return f"RSA: {op} ({key_size} bits)"
 
-    if event == "crypto.aes":
-        mode = args[0] if args else "?"
-        op = args[1] if len(args) > 1 else "?"
-        return f"AES: {op} ({mode})"
+def _details_exec(args: tuple) -> dict:
+    # os.exec: (path, args, env), os.posix_spawn: (path, argv, env)
+    return {"executable": str(args[0])}
 
-    if event == "crypto.chacha20":
-        op = args[0] if args else "?"
-        return f"ChaCha20: {op}"
 
-    # Random events
-    if event == "secrets.token":
-        size = args[0] if args else "?"
-        return f"SecureRandom: {size} bytes"
+def _details_spawn(args: tuple) -> dict:
+    # os.spawn: (mode, path, args, env)
+    return {"executable": str(args[1]) if len(args) > 1 else ""}
 
-    # Encoding & compression events
-    if event == "encoding.hex":
-        op = args[0] if args else "?"
-        return f"Hex: {op}"
 
-    if event == "encoding.zlib":
-        op = args[0] if args else "?"
-        return f"Zlib: {op}"
+def _details_dlopen(args: tuple) -> dict:
+    return {"library": str(args[0])}
 
-    if event == "encoding.gzip":
-        op = args[0] if args else "?"
-        return f"Gzip: {op}"
 
-    if event == "encoding.bz2":
-        op = args[0] if args else "?"
-        return f"Bz2: {op}"
+def _details_env(args: tuple) -> dict:
+    key = args[0]
+    return {"key": key.decode() if isinstance(key, bytes) else str(key)}
 
-    if event == "encoding.lzma":
-        op = args[0] if args else "?"
-        return f"LZMA: {op}"
 
-    if event == "socket.__new__":
-        # Raw socket creation - args: (family, type, proto)
-        import socket
+def _details_getaddrinfo(args: tuple) -> dict:
+    details = {"domain": str(args[0])}
+    if len(args) > 1 and args[1] is not None:
+        details["port"] = args[1]
+    return details
 
-        if len(args) >= 2 and args[1] == socket.SOCK_RAW:
-            return "Raw socket creation"
-        return f"Socket: {args}"
 
-    return f"{event}: {args}"
+def _details_dns(args: tuple) -> dict:
+    return {"domain": str(args[0])}
+
+
+def _details_connect(args: tuple) -> dict:
+    # args: (socket, address) where address is (host, port)
+    details = {}
+    if len(args) >= 2 and isinstance(args[1], tuple):
+        details["host"] = str(args[1][0])
+        if len(args[1]) > 1:
+            details["port"] = args[1][1]
+    return details
+
+
+def _details_urllib_request(args: tuple) -> dict:
+    # args: (url, data, headers, method)
+    if len(args) > 3 and args[3]:
+        method = str(args[3])
+    else:
+        # Infer method from data presence
+        data = args[1] if len(args) > 1 else None
+        method = "POST" if data else "GET"
+    return {"url": str(args[0]), "method": method}
+
+
+def _details_http_request(args: tuple) -> dict:
+    # args: (url, method)
+    return {
+        "url": str(args[0]),
+        "method": str(args[1]) if len(args) > 1 else "GET",
+    }
+
+
+def _details_socket_new(args: tuple) -> dict:
+    # args: (family, type, proto)
+    if len(args) >= 2:
+        is_raw = args[1] == socket.SOCK_RAW
+        return {"socket_type": "SOCK_RAW" if is_raw else str(args[1])}
+    return {}
+
+
+def _details_delete(args: tuple) -> dict:
+    # args: (path,)
+    return {"path": str(args[0])}
+
+
+_DETAIL_EXTRACTORS = {
+    "open": _details_open,
+    "os.system": _details_system,
+    "subprocess.Popen": _details_popen,
+    "os.exec": _details_exec,
+    "os.spawn": _details_spawn,
+    "os.posix_spawn": _details_exec,
+    "ctypes.dlopen": _details_dlopen,
+    "os.putenv": _details_env,
+    "os.unsetenv": _details_env,
+    "os.getenv": _details_env,
+    "os.environ.get": _details_env,
+    "socket.getaddrinfo": _details_getaddrinfo,
+    "socket.gethostbyname": _details_dns,
+    "socket.gethostbyname_ex": _details_dns,
+    "socket.gethostbyaddr": _details_dns,
+    "socket.connect": _details_connect,
+    "urllib.Request": _details_urllib_request,
+    "http.request": _details_http_request,
+    "socket.__new__": _details_socket_new,
+    "os.remove": _details_delete,
+    "os.unlink": _details_delete,
+}
 
 
 def extract_decision_details(event: str, args: tuple) -> dict:
@@ -230,81 +395,9 @@ def extract_decision_details(event: str, args: tuple) -> dict:
     if not args:
         return details
 
-    if event == "open":
-        details["path"] = str(args[0])
-        details["mode"] = args[1] if len(args) > 1 and args[1] is not None else "r"
-        details["is_new_file"] = not Path(args[0]).exists()
-
-    elif event == "os.system":
-        details["command"] = str(args[0])
-
-    elif event == "subprocess.Popen":
-        cmd_args = args[1] if len(args) > 1 else []
-        details["command"] = _build_command(args[0], cmd_args)
-        details["executable"] = str(args[0]) if args[0] else ""
-
-    elif event == "os.exec":
-        details["executable"] = str(args[0]) if args else ""
-
-    elif event == "os.spawn":
-        details["executable"] = str(args[1]) if len(args) > 1 else ""
-
-    elif event == "os.posix_spawn":
-        details["executable"] = str(args[0]) if args else ""
-
-    elif event == "ctypes.dlopen":
-        details["library"] = str(args[0]) if args else ""
-
-    elif event in ("os.putenv", "os.unsetenv", "os.getenv", "os.environ.get"):
-        key = args[0]
-        details["key"] = key.decode() if isinstance(key, bytes) else str(key)
-
-    elif event == "socket.getaddrinfo":
-        details["domain"] = str(args[0])
-        if len(args) > 1 and args[1] is not None:
-            details["port"] = args[1]
-
-    elif event in (
-        "socket.gethostbyname",
-        "socket.gethostbyname_ex",
-        "socket.gethostbyaddr",
-    ):
-        details["domain"] = str(args[0])
-
-    elif event == "socket.connect":
-        # args: (socket, address) where address is (host, port)
-        if len(args) >= 2 and isinstance(args[1], tuple):
-            details["host"] = str(args[1][0])
-            if len(args[1]) > 1:
-                details["port"] = args[1][1]
-
-    elif event == "urllib.Request":
-        # args: (url, data, headers, method)
-        details["url"] = str(args[0]) if args else ""
-        if len(args) > 3 and args[3]:
-            details["method"] = str(args[3])
-        else:
-            # Infer method from data presence
-            data = args[1] if len(args) > 1 else None
-            details["method"] = "POST" if data else "GET"
-
-    elif event == "http.request":
-        # args: (url, method)
-        details["url"] = str(args[0]) if args else ""
-        details["method"] = str(args[1]) if len(args) > 1 else "GET"
-
-    elif event == "socket.__new__":
-        # args: (family, type, proto)
-        import socket
-
-        if len(args) >= 2:
-            is_raw = args[1] == socket.SOCK_RAW
-            details["socket_type"] = "SOCK_RAW" if is_raw else str(args[1])
-
-    elif event in ("os.remove", "os.unlink"):
-        # args: (path,)
-        details["path"] = str(args[0]) if args else ""
-
+    extractor = _DETAIL_EXTRACTORS.get(event)
+    if extractor is not None:
+        details.update(extractor(args))
     return details
 
 
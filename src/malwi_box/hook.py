@@ -9,18 +9,25 @@ This module provides:
 from __future__ import annotations
 
 import atexit
-import inspect
 import os
+import pickle
 import sys
+from _thread import allocate_lock, get_ident
 from collections.abc import Callable
-from typing import TYPE_CHECKING
 
 from malwi_box._audit_hook import (
     clear_callback,
     set_callback,
     set_log_info_events,
 )
+from malwi_box.formatting import (
+    _is_write_mode,
+    extract_decision_details,
+    format_event,
+    format_stack_trace,
+)
 
+TYPE_CHECKING = False  # Avoid importing typing at interpreter start
 if TYPE_CHECKING:
     from malwi_box.engine import BoxEngine
 
@@ -83,24 +90,23 @@ def _configure_info_events(engine: "BoxEngine") -> None:
 # Shared Logging Helpers
 # =============================================================================
 
+# Constant parts of log lines and the prompt, built once. Each starts by
+# clearing the line so it isn't overwritten by progress bars.
+_BLOCKED_PREFIX = f"{Color.CLEAR_LINE}{Color.RED}[malwi-box] Blocked: "
+_LINE_END = f"{Color.RESET}\n"
+_APPROVAL_PROMPT = f"{Color.CLEAR_LINE}Approve? [Y/n/i]: "
+
 
 def _log_violation(event: str, args: tuple, color: str) -> None:
     """Log a permission violation with specified color."""
-    from malwi_box import format_event
-
-    # Clear line first to avoid being overwritten by progress bars
-    msg = f"{Color.CLEAR_LINE}{color}[malwi-box] {format_event(event, args)}{Color.RESET}\n"
+    msg = f"{Color.CLEAR_LINE}{color}[malwi-box] {format_event(event, args)}{_LINE_END}"
     sys.stderr.write(msg)
     sys.stderr.flush()
 
 
 def _log_blocked(event: str, args: tuple) -> None:
     """Log a blocked event (red color with 'Blocked:' prefix)."""
-    from malwi_box import format_event
-
-    # Clear line first to avoid being overwritten by progress bars
-    msg = f"{Color.CLEAR_LINE}{Color.RED}[malwi-box] Blocked: {format_event(event, args)}{Color.RESET}\n"
-    sys.stderr.write(msg)
+    sys.stderr.write(_BLOCKED_PREFIX + format_event(event, args) + _LINE_END)
     sys.stderr.flush()
 
 
@@ -110,26 +116,36 @@ def _prompt_approval() -> str:
     Tries /dev/tty first for interactive approval (works even if stdin is closed,
     which happens in subprocesses). Falls back to stdin for piped input (tests, CI).
     """
-    # Clear line to ensure prompt is visible over progress bars
-    prompt = f"{Color.CLEAR_LINE}Approve? [Y/n/i]: "
-
     # Try /dev/tty first - works even if stdin is closed (e.g., subprocesses)
     try:
         with open("/dev/tty", "r") as tty_in, open("/dev/tty", "w") as tty_out:
-            tty_out.write(prompt)
+            tty_out.write(_APPROVAL_PROMPT)
             tty_out.flush()
             return tty_in.readline().strip().lower()
     except OSError:
         pass  # /dev/tty not available, try stdin
 
     # Fall back to stdin (for piped input in tests/CI)
-    return input(prompt).strip().lower()
+    return input(_APPROVAL_PROMPT).strip().lower()
 
 
 # =============================================================================
 # Hook Callback Factory
 # =============================================================================
 
+# Env var reads, classified by the engine before any permission check
+ENV_READ_EVENTS = frozenset({"os.getenv", "os.environ.get"})
+
+
+def _is_unblocked_env_read(engine: BoxEngine, args: tuple) -> bool:
+    """Check if an env var read is classified as never blocked.
+
+    Safe and info env vars are not checked further. Others ("block") fall
+    through to the permission check.
+    """
+    var_name = args[0] if args else ""
+    return engine.classify_env_var(var_name) in ("silent", "info")
+
 
 def _create_hook_callback(
     engine: BoxEngine,
@@ -142,29 +158,26 @@ def _create_hook_callback(
         on_violation: Called when permission is denied (event, args)
 
     Returns:
-        Hook callback function with recursion guard
+        Hook callback function with a per-thread recursion guard
     """
-    in_hook = False
+    # Threads currently inside the hook. The guard is per thread so that
+    # events from other threads are still checked meanwhile.
+    active: set[int] = set()
 
     def hook(event: str, args: tuple) -> None:
-        nonlocal in_hook
-        if in_hook:
+        thread_id = get_ident()
+        if thread_id in active:
             return
 
-        in_hook = True
+        active.add(thread_id)
         try:
-            # Handle env var reads with unified classification
-            if event in ("os.getenv", "os.environ.get"):
-                var_name = args[0] if args else ""
-                classification = engine.classify_env_var(var_name)
-                if classification in ("silent", "info"):
-                    return  # No blocking for safe/info env vars
-                # "block" falls through to permission check
+            if event in ENV_READ_EVENTS and _is_unblocked_env_read(engine, args):
+                return
 
             if not engine.check_permission(event, args):
                 on_violation(event, args)
         finally:
-            in_hook = False
+            active.discard(thread_id)
 
     return hook
 
@@ -274,9 +287,9 @@ def _get_event_color(event: str, args: tuple, engine: BoxEngine | None = None) -
             if engine._is_sensitive_path(path):
                 return Color.RED
         mode = args[1] if len(args) > 1 else "r"
-        if mode and any(c in mode for c in "wax+"):
+        if mode and _is_write_mode(mode):
             return Color.ORANGE
-    if event in ("os.getenv", "os.environ.get") and args and engine:
+    if event in ENV_READ_EVENTS and args and engine:
         var_name = args[0]
         if isinstance(var_name, bytes):
             var_name = var_name.decode("utf-8", errors="replace")
@@ -288,33 +301,111 @@ def _get_event_color(event: str, args: tuple, engine: BoxEngine | None = None) -
 def get_caller_info() -> list[tuple[str, int, str, str]]:
     """Get call stack excluding malwi-box internals.
 
+    Frames are filtered before any source is read, so only the frames
+    that are shown cost a (cached) source lookup.
+
     Returns:
         List of (filename, lineno, function, code_context) tuples.
     """
-    stack = inspect.stack()
+    import linecache
+
     result = []
 
-    skip_paths = {"malwi_box", "sitecustomize.py"}
+    skip_paths = ("malwi_box", "sitecustomize.py")
 
-    for frame_info in stack:
-        filename = frame_info.filename
+    frame = sys._getframe()
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        lineno = frame.f_lineno or 0
+        frame = frame.f_back
         if any(skip in filename for skip in skip_paths):
             continue
         if "<" in filename:  # e.g., <frozen importlib._bootstrap>
             continue
 
-        result.append(
-            (
-                filename,
-                frame_info.lineno,
-                frame_info.function,
-                frame_info.code_context[0].strip() if frame_info.code_context else "",
-            )
-        )
+        line = linecache.getline(filename, lineno).strip()
+        result.append((filename, lineno, code.co_name, line))
 
     return result
 
 
+# Argument types that are hashable and only compare equal to their own type
+_PLAIN_ARG_TYPES = frozenset({str, bytes, int, type(None)})
+
+# Built-in types whose pickling and hashing never run user code
+_PICKLE_SAFE_TYPES = _PLAIN_ARG_TYPES | {bool, float}
+
+
+class _IdentityKey:
+    """Key for an arbitrary object that compares by identity.
+
+    Hashing or comparing the object itself could run its __hash__/__eq__.
+    The key holds a reference, so the id is not reused while it is stored.
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _IdentityKey) and other.obj is self.obj
+
+
+def _make_hashable(obj):
+    """Convert an object to a hashable form without calling its methods.
+
+    Exact tuples, lists and dicts are converted item by item; any other
+    object that is not of a plain built-in type is keyed by identity.
+    """
+    cls = type(obj)
+    if cls in _PICKLE_SAFE_TYPES:
+        return (cls, obj)
+    if cls is tuple or cls is list:
+        return (cls, tuple(_make_hashable(item) for item in obj))
+    if cls is dict:
+        items = obj.items()
+        return (cls, tuple((_make_hashable(k), _make_hashable(v)) for k, v in items))
+    return _IdentityKey(obj)
+
+
+def _is_picklable_plain(obj) -> bool:
+    """Check if obj is made only of exact tuples, lists and dicts of plain types."""
+    cls = type(obj)
+    if cls in _PICKLE_SAFE_TYPES:
+        return True
+    if cls is tuple or cls is list:
+        return all(map(_is_picklable_plain, obj))
+    if cls is dict:
+        return all(
+            type(k) in _PICKLE_SAFE_TYPES and _is_picklable_plain(v)
+            for k, v in obj.items()
+        )
+    return False
+
+
+def _session_key(event: str, args: tuple) -> tuple:
+    """Build a hashable key identifying an event and its arguments.
+
+    Flat arguments of plain types, as most events have, are used as they
+    are. Nested plain containers are pickled, which serializes them in a
+    single C-level pass. Anything else goes through _make_hashable, since
+    pickling it would run its __reduce__ inside the hook, unaudited.
+    """
+    if _PLAIN_ARG_TYPES.issuperset(map(type, args)):
+        return (event, args)
+    try:
+        if _is_picklable_plain(args):
+            return (event, pickle.dumps(args, protocol=5))
+        return (event, _make_hashable(args))
+    except RecursionError:  # Self-referential or very deeply nested args
+        return (event, _IdentityKey(args))
+
+
 def setup_review_hook(engine: BoxEngine | None = None) -> None:
     """Set up review mode hook.
 
@@ -324,46 +415,42 @@ def setup_review_hook(engine: BoxEngine | None = None) -> None:
     Args:
         engine: BoxEngine instance. If None, creates a new one.
     """
-    from malwi_box import extract_decision_details, format_event
     from malwi_box.engine import BoxEngine
-    from malwi_box.formatting import format_stack_trace
 
     if engine is None:
         engine = BoxEngine()
 
     _configure_info_events(engine)
+    engine.enable_decision_journal()
 
     session_allowed: set[tuple] = set()
-    in_hook = False
-
-    def make_hashable(obj):
-        """Convert an object to a hashable form."""
-        if isinstance(obj, (list, tuple)):
-            return tuple(make_hashable(item) for item in obj)
-        if isinstance(obj, dict):
-            return tuple(sorted((k, make_hashable(v)) for k, v in obj.items()))
-        return obj
+    # Bit per (event, first-arg type) bucket with a session approval, so the
+    # full session key is only built for events that could possibly match
+    session_bloom = bytearray(1 << 13)
+    # Threads currently inside the hook, and a lock that makes other threads
+    # wait for an open prompt instead of running unreviewed
+    active: set[int] = set()
+    review_lock = allocate_lock()
 
     def hook(event: str, args: tuple) -> None:
-        nonlocal in_hook
-        if in_hook:
+        thread_id = get_ident()
+        if thread_id in active:
             return
 
-        # Handle env var reads with unified classification
-        if event in ("os.getenv", "os.environ.get"):
-            var_name = args[0] if args else ""
-            classification = engine.classify_env_var(var_name)
-            if classification in ("silent", "info"):
-                return  # No blocking for safe/info env vars
-            # "block" falls through to permission check
-
-        # Check if already approved this session
-        key = (event, make_hashable(args))
-        if key in session_allowed:
+        if event in ENV_READ_EVENTS and _is_unblocked_env_read(engine, args):
             return
 
-        in_hook = True
+        active.add(thread_id)
+        review_lock.acquire()
         try:
+            # Check if already approved this session
+            bucket = hash((event, type(args[0]) if args else None)) & 0xFFFF
+            key = None
+            if session_bloom[bucket >> 3] & (1 << (bucket & 7)):
+                key = _session_key(event, args)
+                if key in session_allowed:
+                    return
+
             if engine.check_permission(event, args):
                 return
 
@@ -400,7 +487,8 @@ def setup_review_hook(engine: BoxEngine | None = None) -> None:
                 engine.save_decisions()
                 os._exit(1)
 
-            session_allowed.add(key)
+            session_allowed.add(key or _session_key(event, args))
+            session_bloom[bucket >> 3] |= 1 << (bucket & 7)
             details = extract_decision_details(event, args)
             engine.record_decision(event, args, allowed=True, details=details)
 
@@ -413,10 +501,26 @@ def setup_review_hook(engine: BoxEngine | None = None) -> None:
             # Save immediately after each approval
             engine.save_decisions()
         finally:
-            in_hook = False
+            review_lock.release()
+            active.discard(thread_id)
 
     def save_on_exit():
-        engine.save_decisions()
+        # Writing the config is malwi-box's own I/O; don't prompt for it
+        thread_id = get_ident()
+        active.add(thread_id)
+        try:
+            engine.save_decisions()
+        finally:
+            active.discard(thread_id)
+
+    def reset_after_fork():
+        # Only the forking thread survives; a lock held by another one
+        # would never be released in the child
+        nonlocal review_lock
+        active.clear()
+        review_lock = allocate_lock()
 
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=reset_after_fork)
     atexit.register(save_on_exit)
     install_hook(hook)
@@ -157,34 +157,78 @@ static void inject_python_hook(void) {
         setup_func = "setup_run_hook";
     }
 
-    // Build Python code to set up the hook
-    char code[1024];
+    // Call the setup function through the C API rather than compiling a
+    // Python snippet on every interpreter start. Mirrors:
+    //   try:
+    //       from malwi_box.hook import <setup_func>
+    //       <setup_func>(BoxEngine(config_path=...))  # or <setup_func>()
+    //   except ImportError:
+    //       pass  # malwi_box not available
     const char *config_path = getenv("MALWI_BOX_CONFIG");
-    if (config_path && config_path[0]) {
-        snprintf(code, sizeof(code),
-            "try:\n"
-            "    from malwi_box.hook import %s\n"
-            "    from malwi_box.engine import BoxEngine\n"
-            "    engine = BoxEngine(config_path='%s')\n"
-            "    %s(engine)\n"
-            "except ImportError:\n"
-            "    pass  # malwi_box not available\n",
-            setup_func, config_path, setup_func);
-    } else {
-        snprintf(code, sizeof(code),
-            "try:\n"
-            "    from malwi_box.hook import %s\n"
-            "    %s()\n"
-            "except ImportError:\n"
-            "    pass  # malwi_box not available\n",
-            setup_func, setup_func);
+    PyObject *setup = NULL;
+    PyObject *engine = NULL;
+    PyObject *result = NULL;
+
+    PyObject *hook_module = PyImport_ImportModule("malwi_box.hook");
+    if (hook_module) {
+        setup = PyObject_GetAttrString(hook_module, setup_func);
+        Py_DECREF(hook_module);
+    }
+
+    if (setup && config_path && config_path[0]) {
+        PyObject *engine_module = PyImport_ImportModule("malwi_box.engine");
+        PyObject *engine_class = NULL;
+        if (engine_module) {
+            engine_class = PyObject_GetAttrString(engine_module, "BoxEngine");
+            Py_DECREF(engine_module);
+        }
+        PyObject *kwargs = engine_class ? Py_BuildValue("{s:N}", "config_path",
+                                          PyUnicode_DecodeFSDefault(config_path))
+                                        : NULL;
+        PyObject *no_args = kwargs ? PyTuple_New(0) : NULL;
+        if (no_args) {
+            engine = PyObject_Call(engine_class, no_args, kwargs);
+        }
+        Py_XDECREF(no_args);
+        Py_XDECREF(kwargs);
+        Py_XDECREF(engine_class);
+        if (engine) {
+            result = PyObject_CallOneArg(setup, engine);
+        }
+    } else if (setup) {
+        result = PyObject_CallNoArgs(setup);
     }
 
-    int result = PyRun_SimpleString(code);
+    if (!result) {
+        if (PyErr_ExceptionMatches(PyExc_ImportError)) {
+            PyErr_Clear();  // malwi_box not available
+        } else {
+            PyErr_Print();
+        }
+    }
     if (verbose) {
         fprintf(stderr, "[malwi_python] Hook injection %s\n",
-                result == 0 ? "succeeded" : "failed");
+                result ? "succeeded" : "failed");
     }
+    Py_XDECREF(result);
+    Py_XDECREF(engine);
+    Py_XDECREF(setup);
+}
+
+/**
+ * Insert dir at the front of sys.path unless it is already present
+ */
+static void prepend_sys_path(const char *dir) {
+    PyObject *sys_path = PySys_GetObject("path");  // Borrowed reference
+    PyObject *entry = PyUnicode_DecodeFSDefault(dir);
+    if (sys_path && entry && PyList_Check(sys_path)) {
+        int found = PySequence_Contains(sys_path, entry);
+        if (found == 0) {
+            PyList_Insert(sys_path, 0, entry);
+        }
+    }
+    Py_XDECREF(entry);
+    PyErr_Clear();
 }
 
 /**
@@ -296,19 +340,17 @@ int main(int argc, char *argv[]) {
 
     // Add executable's directory to sys.path so we can find malwi_box
     if (exe_dir) {
-        char path_code[4096];
-        snprintf(path_code, sizeof(path_code),
-            "import sys\n"
-            "exe_dir = '%s'\n"
-            "if exe_dir not in sys.path:\n"
-            "    sys.path.insert(0, exe_dir)\n"
-            "# Also add parent dir (for package imports when in site-packages)\n"
-            "import os\n"
-            "parent = os.path.dirname(exe_dir)\n"
-            "if parent not in sys.path:\n"
-            "    sys.path.insert(0, parent)\n",
-            exe_dir);
-        PyRun_SimpleString(path_code);
+        prepend_sys_path(exe_dir);
+
+        // Also add parent dir (for package imports when in site-packages)
+        char parent[4096];
+        strncpy(parent, exe_dir, sizeof(parent) - 1);
+        parent[sizeof(parent) - 1] = '\0';
+        char *slash = strrchr(parent, '/');
+        if (slash) {
+            slash[slash == parent ? 1 : 0] = '\0';
+            prepend_sys_path(parent);
+        }
         if (verbose) {
             fprintf(stderr, "[malwi_python] Added %s to sys.path\n", exe_dir);
         }
@@ -188,34 +188,32 @@ def _escape_string(s: str) -> str:
 
 def dump(config: dict, f) -> None:
     """Write config dict as TOML to file object."""
+    f.write(dumps(config))
+
+
+def dumps(config: dict) -> str:
+    """Write config dict as TOML string."""
+    lines = []
     for key, value in config.items():
         if isinstance(value, list):
             if not value:
-                f.write(f"{key} = []\n")
+                lines.append(f"{key} = []")
             else:
-                f.write(f"{key} = [\n")
+                lines.append(f"{key} = [")
                 for item in value:
                     if isinstance(item, dict):
                         pairs = ", ".join(
                             f'{k} = "{_escape_string(v)}"' for k, v in item.items()
                         )
-                        f.write(f"  {{ {pairs} }},\n")
+                        lines.append(f"  {{ {pairs} }},")
                     else:
-                        f.write(f'  "{_escape_string(item)}",\n')
-                f.write("]\n")
+                        lines.append(f'  "{_escape_string(item)}",')
+                lines.append("]")
         elif isinstance(value, str):
-            f.write(f'{key} = "{_escape_string(value)}"\n')
+            lines.append(f'{key} = "{_escape_string(value)}"')
         elif isinstance(value, bool):
-            f.write(f"{key} = {str(value).lower()}\n")
+            lines.append(f"{key} = {str(value).lower()}")
         elif isinstance(value, (int, float)):
-            f.write(f"{key} = {value}\n")
-        f.write("\n")
-
-
-def dumps(config: dict) -> str:
-    """Write config dict as TOML string."""
-    import io
-
-    f = io.StringIO()
-    dump(config, f)
-    return f.getvalue()
+            lines.append(f"{key} = {value}")
+        lines.append("")
+    return "\n".join(lines) + "\n" if lines else ""
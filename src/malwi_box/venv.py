@@ -2,6 +2,7 @@
 
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import sys
@@ -216,12 +217,16 @@ def build_malwi_python(
     use_fallback = False
 
     try:
-        cflags = subprocess.check_output(
-            [str(python_config), "--cflags"], text=True, stderr=subprocess.STDOUT
-        ).strip()
-        ldflags = subprocess.check_output(
-            [str(python_config), "--ldflags", "--embed"], text=True, stderr=subprocess.STDOUT
-        ).strip()
+        # One invocation prints one line per flag group: cflags, then ldflags
+        output = subprocess.check_output(
+            [str(python_config), "--cflags", "--ldflags", "--embed"],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        )
+        lines = output.strip().splitlines()
+        if len(lines) < 2:
+            raise subprocess.CalledProcessError(0, str(python_config), output)
+        cflags, ldflags = lines[0].strip(), lines[1].strip()
 
         # Validate that python3-config matches target Python version
         is_valid, error = validate_python_config(python_executable, python_config, ldflags)
@@ -270,15 +275,25 @@ def build_malwi_python(
 
     compiler = "clang" if sys.platform == "darwin" else "gcc"
 
-    # Build command with rpath for finding libpython at runtime
-    rpath_flag = f"-Wl,-rpath,{lib_dir}"
-    lib_flag = f"-L{lib_dir}"
-    python_home_define = f'-DDEFAULT_PYTHON_HOME=\\"{python_home}\\"'
-    enabled_define = f"-DDEFAULT_ENABLED={1 if default_enabled else 0}"
+    # Build command with rpath for finding libpython at runtime.
+    # Passed as an argv list (no shell), so paths with spaces need no quoting.
+    cmd = [
+        compiler,
+        *shlex.split(cflags),
+        f'-DDEFAULT_PYTHON_HOME="{python_home}"',
+        f"-DDEFAULT_ENABLED={1 if default_enabled else 0}",
+        "-o",
+        str(output_path),
+        str(src),
+        f"-L{lib_dir}",
+        *shlex.split(ldflags),
+        f"-Wl,-rpath,{lib_dir}",
+    ]
 
-    cmd = f'{compiler} {cflags} {python_home_define} {enabled_define} -o "{output_path}" "{src}" {lib_flag} {ldflags} {rpath_flag}'
-
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError as e:
+        return False, f"Could not run compiler '{compiler}': {e}"
     if result.returncode != 0:
         error = result.stderr or result.stdout or "Unknown compilation error"
         return False, error
@@ -1,7 +1,10 @@
 """Python wrapper helpers for subprocess hook injection."""
 
+import functools
+import hashlib
 import os
 import shutil
+import stat
 import sys
 import tempfile
 from pathlib import Path
@@ -61,13 +64,115 @@ def get_wrapper_env(
     return env
 
 
+def _is_wrapper_copy(path: Path, wrapper_bytes: bytes) -> bool:
+    """Check if path is a regular file with exactly the wrapper's content.
+
+    Cached copies run outside the sandbox, so size and mtime are not enough:
+    os.utime() can give a replaced file the wrapper's mtime.
+    """
+    try:
+        st = path.lstat()
+        if not stat.S_ISREG(st.st_mode) or st.st_size != len(wrapper_bytes):
+            return False
+        return path.read_bytes() == wrapper_bytes
+    except OSError:
+        return False
+
+
+def _user_cache_dir() -> Path:
+    """Get the per-user cache directory for malwi-box.
+
+    Uses $XDG_CACHE_HOME (or ~/.cache) on Linux and ~/Library/Caches on macOS.
+    """
+    if sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "malwi-box"
+
+
+def _private_cache_dir(name: str) -> Path | None:
+    """Get a subdirectory of the user cache dir that only this user can access.
+
+    Returns:
+        Path to the directory, or None if it cannot be created or another
+        user created it or can write to it.
+    """
+    try:
+        cache_dir = _user_cache_dir()
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = cache_dir / name
+        path.mkdir(mode=0o700, exist_ok=True)
+        dir_stat = path.lstat()
+    except (OSError, RuntimeError):  # RuntimeError: home dir unknown
+        return None
+
+    if (
+        not stat.S_ISDIR(dir_stat.st_mode)
+        or dir_stat.st_uid != os.getuid()
+        or dir_stat.st_mode & 0o077
+    ):
+        return None
+    return path
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_bin_dir(wrapper_path: Path) -> Path | None:
+    """Get a per-user bin directory with the wrapper as python/python3.
+
+    The directory lives in the user's cache dir and is named after the
+    wrapper's path, size and mtime, so it is populated once and reused by
+    later invocations until the wrapper is rebuilt. An existing copy is
+    only reused if its bytes match the wrapper. The wrapper also puts
+    the parent of its directory on sys.path, which is why this is not a
+    shared location like /tmp.
+
+    Returns:
+        Path to the bin directory, or None if it cannot be used safely.
+    """
+    try:
+        wrapper_stat = wrapper_path.stat()
+    except OSError:
+        return None
+    key = f"{wrapper_path}:{wrapper_stat.st_size}:{wrapper_stat.st_mtime_ns}"
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    # Never run binaries from a directory another user created or can write to
+    bin_dir = _private_cache_dir(f"bin-{digest}")
+    if bin_dir is None:
+        return None
+
+    python = bin_dir / "python"
+    python3 = bin_dir / "python3"
+    try:
+        wrapper_bytes = wrapper_path.read_bytes()
+        if not _is_wrapper_copy(python, wrapper_bytes):
+            # Write to a fresh private file, then atomically move it into place
+            tmp = bin_dir / f".python.{os.getpid()}"
+            tmp.unlink(missing_ok=True)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o755)
+            with os.fdopen(fd, "wb") as f:
+                f.write(wrapper_bytes)
+            shutil.copystat(wrapper_path, tmp)
+            tmp.chmod(0o755)
+            os.replace(tmp, python)
+        if not (python3.exists() and os.path.samefile(python, python3)):
+            tmp = bin_dir / f".python3.{os.getpid()}"
+            os.link(python, tmp)
+            os.replace(tmp, python3)
+    except OSError:
+        return None
+
+    return bin_dir
+
+
 def setup_wrapper_bin_dir(
     mode: str = "run", config_path: str | None = None
 ) -> tuple[Path | None, dict[str, str]]:
-    """Set up a temporary bin directory with the malwi_python wrapper.
+    """Set up a bin directory with the malwi_python wrapper.
 
-    Creates a temp directory with copies of the wrapper named
-    "python" and "python3" that can be prepended to PATH.
+    The directory contains the wrapper named "python" and "python3" and can
+    be prepended to PATH. A per-user cached directory is reused when
+    possible; otherwise a fresh temp directory is created.
 
     Args:
         mode: One of "run", "force", or "review"
@@ -80,7 +185,13 @@ def setup_wrapper_bin_dir(
     if wrapper_path is None:
         return None, {}
 
-    # Create temp directory
+    env = get_wrapper_env(mode, config_path)
+
+    bin_dir = _cached_bin_dir(wrapper_path)
+    if bin_dir is not None:
+        return bin_dir, env
+
+    # Fall back to a temp directory private to this invocation
     bin_dir = Path(tempfile.mkdtemp(prefix="malwi_box_"))
 
     # Copy wrapper as python and python3
@@ -89,12 +200,77 @@ def setup_wrapper_bin_dir(
         shutil.copy2(wrapper_path, dest)
         dest.chmod(0o755)
 
-    env = get_wrapper_env(mode, config_path)
-
     return bin_dir, env
 
 
+def is_cached_bin_dir(bin_dir: Path | None) -> bool:
+    """Check if bin_dir is the shared cached bin dir, which needs no cleanup."""
+    wrapper_path = get_malwi_python_path()
+    return (
+        bin_dir is not None
+        and wrapper_path is not None
+        and bin_dir == _cached_bin_dir(wrapper_path)
+    )
+
+
 def cleanup_wrapper_bin_dir(bin_dir: Path) -> None:
-    """Clean up a temporary bin directory."""
+    """Clean up a temporary bin directory.
+
+    Cached bin directories are shared with other invocations and kept.
+    """
+    if is_cached_bin_dir(bin_dir):
+        return
     if bin_dir and bin_dir.exists():
         shutil.rmtree(bin_dir, ignore_errors=True)
+
+
+# Shared bin directories keyed by (mode, config_path), see WrapperContext
+_active_wrappers: dict[tuple[str, str | None], list] = {}
+
+
+class WrapperContext:
+    """Context manager providing a wrapper bin directory for running Python.
+
+    Contexts with the same mode and config path share one bin directory,
+    which is set up on first entry and cleaned up when the last context
+    exits. The wrapped interpreter path is computed once.
+
+    Attributes:
+        bin_dir: Wrapper bin directory, or None if wrapper not available.
+        env: Environment variables to set for the wrapper.
+        python_path: String path to the wrapped python executable.
+        cached: Whether bin_dir is the shared cached directory, which outlives
+            the context and so does not need cleaning up by this process.
+    """
+
+    def __init__(self, mode: str = "run", config_path: str | None = None):
+        self.key = (mode, config_path)
+        self.bin_dir: Path | None = None
+        self.env: dict[str, str] = {}
+        self.python_path = ""
+        self.cached = False
+
+    def __enter__(self) -> "WrapperContext":
+        shared = _active_wrappers.get(self.key)
+        if shared is None:
+            bin_dir, env = setup_wrapper_bin_dir(*self.key)
+            if bin_dir is None:
+                return self
+            # [bin_dir, env, python_path, cached, refcount]
+            python_path = str(bin_dir / "python")
+            shared = [bin_dir, env, python_path, is_cached_bin_dir(bin_dir), 0]
+            _active_wrappers[self.key] = shared
+
+        shared[4] += 1
+        self.bin_dir, self.env, self.python_path, self.cached = shared[:4]
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.bin_dir is None:
+            return
+        shared = _active_wrappers[self.key]
+        shared[4] -= 1
+        if shared[4] == 0:
+            del _active_wrappers[self.key]
+            cleanup_wrapper_bin_dir(self.bin_dir)
+        self.bin_dir = None
@@ -171,3 +171,33 @@ def test_os_getenv_no_double_event():
     # Should only have one event (os.getenv), not two (os.getenv + os.environ.get)
     assert len(events) == 1
     assert events[0][0] == "os.getenv"
+
+
+def test_recursion_guard_is_per_thread(tmp_path):
+    """Test that events from other threads are checked while one is in the hook."""
+    import threading
+
+    from malwi_box import toml
+    from malwi_box.engine import BoxEngine
+    from malwi_box.hook import _create_hook_callback
+
+    config_path = tmp_path / ".malwi-box.toml"
+    config_path.write_text(toml.dumps({"allow_read": []}))
+    engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+    args = (str(tmp_path / "secret.txt"), "r", 0)
+    violations = []
+
+    def on_violation(event, args):
+        violations.append(threading.get_ident())
+        if len(violations) == 1:
+            thread = threading.Thread(target=hook, args=("open", args))
+            thread.start()
+            thread.join()
+            # Re-entering from the same thread is still skipped
+            hook("open", args)
+
+    hook = _create_hook_callback(engine, on_violation)
+    hook("open", args)
+
+    assert len(violations) == 2
+    assert violations[0] != violations[1]
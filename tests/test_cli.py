@@ -289,6 +289,14 @@ class TestFormatEvent:
         assert "unknown.event" in result
         assert "arg1" in result
 
+    def test_format_unknown_event_abbreviates_large_args(self):
+        """Test that the fallback does not repr large payloads in full."""
+        from malwi_box.formatting import format_event as _format_event
+
+        result = _format_event("unknown.event", ("x" * 10_000, list(range(10_000))))
+        assert result.startswith("unknown.event: ('xxx")
+        assert len(result) < 300
+
 
 class TestMakeHashable:
     """Tests for session tracking with unhashable args."""
@@ -321,3 +329,78 @@ print("done")
         )
         # Should see the approval prompt
         assert "[malwi-box]" in result.stderr
+
+    def test_session_key_is_hashable_for_nested_args(self):
+        """Test that session keys can be built from nested unhashable args."""
+        from malwi_box.hook import _session_key
+
+        args = ("/bin/ls", ["/bin/ls", "-la"], {"A": ["1"]})
+        key = _session_key("subprocess.Popen", args)
+        assert key in {key}
+        assert key == _session_key("subprocess.Popen", args)
+        assert key != _session_key("subprocess.Popen", ("/bin/ls", ["/bin/ls"], {}))
+
+    def test_session_key_keeps_plain_arg_types_apart(self):
+        """Test that flat args only match args of the same types."""
+        from malwi_box.hook import _session_key
+
+        key = _session_key("open", ("/tmp/x", "r", 1))
+        assert key == _session_key("open", ("/tmp/x", "r", 1))
+        assert key != _session_key("open", ("/tmp/x", "r", True))
+        assert key != _session_key("open", ("/tmp/x", "r", 1.0))
+        assert key != _session_key("open", (b"/tmp/x", "r", 1))
+
+    def test_session_key_falls_back_for_unpicklable_args(self):
+        """Test that unpicklable args (e.g. sockets) still produce a key."""
+        import socket
+
+        from malwi_box.hook import _session_key
+
+        with socket.socket() as sock:
+            key = _session_key("socket.connect", (sock, ("127.0.0.1", 80)))
+        assert key in {key}
+
+    def test_session_key_runs_no_user_code(self):
+        """Test that keying objects never calls their pickle or hash methods."""
+        from malwi_box.hook import _session_key
+
+        class Hostile:
+            def __reduce__(self):
+                raise AssertionError("__reduce__ called")
+
+            def __hash__(self):
+                raise AssertionError("__hash__ called")
+
+            def __eq__(self, other):
+                raise AssertionError("__eq__ called")
+
+        obj = Hostile()
+        key = _session_key("pickle.find_class", ("m", [obj, {"k": obj}]))
+        assert key in {key}
+        assert key == _session_key("pickle.find_class", ("m", [obj, {"k": obj}]))
+        assert key != _session_key("pickle.find_class", ("m", [Hostile(), {}]))
+
+    def test_session_key_handles_self_referential_args(self):
+        """Test that a list containing itself still produces a key."""
+        from malwi_box.hook import _session_key
+
+        args = []
+        args.append(args)
+        key = _session_key("unknown.event", (args,))
+        assert key in {key}
+
+
+class TestCallerInfo:
+    """Tests for the stack shown by the review prompt's inspect option."""
+
+    def test_caller_info_includes_calling_line(self):
+        """Test that the caller's frame is reported with its source line."""
+        from malwi_box.hook import get_caller_info
+
+        frames = get_caller_info()  # marker
+        filename, lineno, function, line = frames[0]
+        assert filename == __file__
+        assert function == "test_caller_info_includes_calling_line"
+        assert line == "frames = get_caller_info()  # marker"
+        assert lineno > 0
+        assert not any("malwi_box" in f[0] for f in frames)
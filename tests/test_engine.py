@@ -87,6 +87,31 @@ class TestFilePermissions:
         # Simulate 'open' event for modifying existing file
         assert engine.check_permission("open", (str(test_file), "w", 0))
 
+    def test_replaced_allow_list_is_recompiled(self, tmp_path):
+        """Test that replacing a config list takes effect for later checks."""
+        allowed = tmp_path / "allowed"
+        allowed.mkdir()
+        test_file = allowed / "test.txt"
+        test_file.write_text("test")
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps({"allow_modify": []}))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        assert not engine.check_permission("open", (str(test_file), "w", 0))
+
+        engine.config["allow_modify"] = [str(allowed)]
+        assert engine.check_permission("open", (str(test_file), "w", 0))
+
+    def test_recording_decision_keeps_compiled_lists(self, tmp_path):
+        """Test that recording a decision does not recompile the allow lists."""
+        engine = BoxEngine(config_path=tmp_path / ".malwi-box.toml", workdir=tmp_path)
+        engine.check_permission("open", (str(tmp_path / "a.txt"), "r", 0))
+        compiled = dict(engine._compiled_lists)
+        assert compiled
+
+        engine.record_decision("os.system", ("true",), True, {"command": "true"})
+        assert engine._compiled_lists == compiled
+
     def test_block_read_outside_allowed(self, tmp_path):
         """Test that reads outside allowed paths are blocked."""
         config = {
@@ -169,6 +194,30 @@ class TestHashVerification:
         engine = BoxEngine(config_path=tmp_path / ".malwi-box.toml", workdir=tmp_path)
         assert not engine._verify_file_hash(test_file, wrong_hash)
 
+    def test_hash_rechecked_after_file_changes(self, tmp_path, monkeypatch):
+        """Test that a cached digest is not reused once the file changes."""
+        import os
+
+        from malwi_box import engine as engine_module
+
+        # Cache digests even though the test file was just written
+        monkeypatch.setattr(engine_module, "HASH_CACHE_RACY_NS", -1)
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("hello world")
+        expected_hash = (
+            "sha256:b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9"
+        )
+
+        engine = BoxEngine(config_path=tmp_path / ".malwi-box.toml", workdir=tmp_path)
+        assert engine._verify_file_hash(test_file, expected_hash)
+        assert str(test_file) in engine._hash_cache
+
+        # Same size, mtime restored: inode ctime still changes
+        st = test_file.stat()
+        test_file.write_text("hello WORLD")
+        os.utime(test_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert not engine._verify_file_hash(test_file, expected_hash)
+
 
 class TestShellCommands:
     """Tests for shell command permission checks."""
@@ -652,6 +701,27 @@ class TestExecutableControl:
             "subprocess.Popen", (str(exe), [], None, None)
         )
 
+    def test_earlier_glob_wins_over_wrong_hash(self, tmp_path):
+        """Test that entries are still matched in config order."""
+        exe = tmp_path / "test_exe"
+        exe.write_text("#!/bin/bash\necho test")
+        exe.chmod(0o755)
+
+        wrong_hash = (
+            "sha256:0000000000000000000000000000000000000000000000000000000000000000"
+        )
+        pinned = {"path": str(exe), "hash": wrong_hash}
+        glob = str(tmp_path / "test_*")
+        args = (str(exe), [], None, None)
+
+        for allowed, entries in ((True, [glob, pinned]), (False, [pinned, glob])):
+            config = {"allow_executables": entries, "allow_shell_commands": ["*"]}
+            config_path = tmp_path / ".malwi-box.toml"
+            config_path.write_text(toml.dumps(config))
+
+            engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+            assert engine.check_permission("subprocess.Popen", args) is allowed
+
     def test_save_and_reload_os_exec_permission(self, tmp_path):
         """Test that saved os.exec permission works after reload.
 
@@ -693,6 +763,205 @@ class TestExecutableControl:
         engine2 = BoxEngine(config_path=str(config_path), workdir=tmp_path)
         assert engine2.check_permission("subprocess.Popen", ("/bin/ls", ["-la"]))
 
+    def test_save_only_merges_new_decisions(self, tmp_path):
+        """Test that each save only merges decisions recorded since the last one."""
+        config_path = tmp_path / ".malwi-box.toml"
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+
+        engine.record_decision(
+            "subprocess.Popen",
+            ("/bin/ls", ["-la"]),
+            allowed=True,
+            details={"executable": "/bin/ls", "command": "/bin/ls -la"},
+        )
+        engine.save_decisions()
+        assert engine._decisions == []
+
+        engine.record_decision(
+            "subprocess.Popen",
+            ("/bin/echo", ["hi"]),
+            allowed=True,
+            details={"executable": "/bin/echo", "command": "/bin/echo hi"},
+        )
+        engine.save_decisions()
+
+        # Decisions from both saves end up in the config
+        engine2 = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        assert engine2.check_permission("subprocess.Popen", ("/bin/ls", ["-la"]))
+        assert engine2.check_permission("subprocess.Popen", ("/bin/echo", ["hi"]))
+
+    def test_decisions_journaled_until_saved(self, tmp_path, monkeypatch):
+        """Test that journaled decisions survive a session that never saved."""
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        config_path = tmp_path / ".malwi-box.toml"
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine.enable_decision_journal()
+        journal_path = engine._journal_path
+
+        engine.record_decision(
+            "subprocess.Popen",
+            ("/bin/ls", ["-la"]),
+            allowed=True,
+            details={"executable": "/bin/ls", "command": "/bin/ls -la"},
+        )
+        assert journal_path.exists()
+        assert journal_path.parent == tmp_path / "cache" / "journal"
+        assert not config_path.exists()
+
+        # A later session merges the leftover journal into the config
+        engine2 = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine2.enable_decision_journal()
+        assert not journal_path.exists()
+
+        engine3 = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        assert engine3.check_permission("subprocess.Popen", ("/bin/ls", ["-la"]))
+
+    def test_save_keeps_journals_of_other_sessions(self, tmp_path, monkeypatch):
+        """Test that a save only removes the saving process's own journal."""
+        import os
+
+        from malwi_box import engine as engine_module
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        config_path = tmp_path / ".malwi-box.toml"
+        pid = os.getpid()
+        engine_a = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine_a.enable_decision_journal()
+        engine_a.record_decision(
+            "os.system", ("curl x",), allowed=True, details={"command": "curl x"}
+        )
+
+        # A second live session on the same config, e.g. a sandboxed child
+        monkeypatch.setattr(os, "getpid", lambda: pid + 1)
+        engine_b = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine_b.enable_decision_journal()
+        engine_b.record_decision(
+            "os.system", ("wget y",), allowed=True, details={"command": "wget y"}
+        )
+        engine_b.save_decisions()
+        assert engine_a._journal_path.exists()
+        assert not engine_b._journal_path.exists()
+
+        # Session A is killed before saving; the next session recovers it
+        monkeypatch.setattr(engine_module, "_pid_alive", lambda pid: False)
+        monkeypatch.setattr(os, "getpid", lambda: pid + 2)
+        engine_c = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine_c.enable_decision_journal()
+
+        assert not engine_a._journal_path.exists()
+        saved_config = toml.loads(config_path.read_text())
+        assert sorted(saved_config["allow_shell_commands"]) == ["curl x", "wget y"]
+
+    def test_journal_removed_after_save(self, tmp_path, monkeypatch):
+        """Test that saving decisions removes the journal."""
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        config_path = tmp_path / ".malwi-box.toml"
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine.enable_decision_journal()
+
+        engine.record_decision(
+            "os.system",
+            ("echo hi",),
+            allowed=True,
+            details={"command": "echo hi"},
+        )
+        engine.save_decisions()
+
+        assert not engine._journal_path.exists()
+        assert config_path.exists()
+
+    def test_journal_skips_torn_lines(self, tmp_path, monkeypatch):
+        """Test that a partially written journal line is ignored."""
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        config_path = tmp_path / ".malwi-box.toml"
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine.enable_decision_journal()
+        journal_path = engine._journal_path
+        journal_path.write_text(
+            '{"event": "os.system", "allowed": true, '
+            '"details": {"command": "echo hi"}}\n'
+            '{"event": "os.sys'
+        )
+
+        engine2 = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine2.enable_decision_journal()
+
+        assert not journal_path.exists()
+        saved_config = toml.loads(config_path.read_text())
+        assert saved_config["allow_shell_commands"] == ["echo hi"]
+
+    def test_journal_planted_in_workdir_is_ignored(self, tmp_path, monkeypatch):
+        """Test that a journal sandboxed code wrote next to the config is not merged."""
+        from malwi_box import engine as engine_module
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        monkeypatch.setattr(engine_module, "_pid_alive", lambda pid: False)
+        config_path = tmp_path / ".malwi-box.toml"
+        planted = tmp_path / ".malwi-box.toml.journal.4000000"
+        planted.write_text(
+            '{"event": "os.system", "allowed": true, "details": {"command": "*"}}\n'
+        )
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine.enable_decision_journal()
+
+        assert planted.exists()
+        assert not config_path.exists()
+        assert not engine.check_permission("os.system", ("rm -rf /",))
+
+    def test_journal_disabled_for_shared_cache_dir(self, tmp_path, monkeypatch):
+        """Test that no journal is used if other users can write to its dir."""
+        from malwi_box import wrapper
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        (tmp_path / "cache" / "journal").mkdir(parents=True)
+        (tmp_path / "cache" / "journal").chmod(0o777)
+
+        engine = BoxEngine(config_path=tmp_path / ".malwi-box.toml", workdir=tmp_path)
+        engine.enable_decision_journal()
+        assert engine._journal_path is None
+
+    def test_duplicate_decisions_recorded_once(self, tmp_path):
+        """Test that a decision repeating a pending one is not recorded again."""
+        engine = BoxEngine(config_path=tmp_path / ".malwi-box.toml", workdir=tmp_path)
+        details = {"path": str(tmp_path / "a.txt"), "mode": "r", "is_new_file": False}
+
+        engine.record_decision("open", (details["path"], "r", 0), True, details)
+        engine.record_decision("open", (details["path"], "r", 524288), True, details)
+        assert len(engine._decisions) == 1
+
+        engine.save_decisions()
+        engine.record_decision("open", (details["path"], "r", 0), True, details)
+        assert len(engine._decisions) == 1
+
+    def test_save_replaces_config_atomically(self, tmp_path):
+        """Test that saving keeps the config's mode and leaves no temp file."""
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps({"allow_shell_commands": []}))
+        config_path.chmod(0o600)
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        engine.record_decision(
+            "os.system",
+            ("echo hi",),
+            allowed=True,
+            details={"command": "echo hi"},
+        )
+        engine.save_decisions()
+
+        saved_config = toml.loads(config_path.read_text())
+        assert saved_config["allow_shell_commands"] == ["echo hi"]
+        assert config_path.stat().st_mode & 0o777 == 0o600
+        assert [p.name for p in tmp_path.iterdir()] == [".malwi-box.toml"]
+
     def test_save_executable_hash_fallback(self, tmp_path):
         """Test that unresolvable executable falls back to path-only."""
         config_path = tmp_path / ".malwi-box.toml"
@@ -812,6 +1081,62 @@ class TestDomainPermissions:
             "socket.getaddrinfo", ("www.example.com", 80, 0, 1, 0)
         )
 
+    def test_domain_match_ignores_case_not_suffix(self, tmp_path):
+        """Test that domains match case-insensitively but only on label bounds."""
+        config = {"allow_domains": ["example.com"]}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+
+        event = "socket.gethostbyname"
+        assert engine.check_permission(event, ("API.Example.COM",))
+        assert not engine.check_permission(event, ("badexample.com",))
+        assert not engine.check_permission(event, ("example.com.evil",))
+
+    def test_ip_literal_lookup_needs_no_domain(self, tmp_path):
+        """Test that resolving an IP literal is allowed, reverse lookups are not."""
+        config = {"allow_domains": [], "allow_ips": []}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+
+        assert engine.check_permission("socket.getaddrinfo", ("8.8.8.8", 53))
+        assert engine.check_permission("socket.gethostbyname", ("2001:db8::1",))
+        assert not engine.check_permission("socket.gethostbyaddr", ("8.8.8.8",))
+        assert not engine.check_permission("socket.gethostbyname_ex", ("8.8.8.8",))
+        # The connection itself is still checked against allow_ips
+        assert not engine.check_permission("socket.connect", (None, ("8.8.8.8", 53)))
+
+    def test_allowed_host_resolved_once_per_ttl(self, tmp_path, monkeypatch):
+        """Test that an allowed host's IPs are not looked up again per port."""
+        import socket
+
+        from malwi_box import engine as engine_module
+
+        lookups = []
+        getaddrinfo = socket.getaddrinfo
+
+        def counting_getaddrinfo(host, *args, **kwargs):
+            lookups.append(host)
+            return getaddrinfo(host, *args, **kwargs)
+
+        monkeypatch.setattr(socket, "getaddrinfo", counting_getaddrinfo)
+        config = {"allow_domains": ["localhost"]}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+
+        assert engine.check_permission("socket.getaddrinfo", ("localhost", 80))
+        assert engine.check_permission("socket.getaddrinfo", ("localhost", 8080))
+        assert lookups == ["localhost"]
+
+        monkeypatch.setattr(engine_module, "RESOLVED_HOST_TTL", 0)
+        assert engine.check_permission("socket.getaddrinfo", ("localhost", 8081))
+        assert lookups == ["localhost", "localhost"]
+
 
 class TestEnvVarPermissions:
     """Tests for environment variable permission checks."""
@@ -865,6 +1190,33 @@ class TestEnvVarPermissions:
         # Non-safe vars should be blocked
         assert not engine.check_permission("os.getenv", ("MY_CUSTOM_VAR",))
 
+    def test_allowed_env_read_is_cached(self, tmp_path):
+        """Test that allows are cached until a decision is recorded."""
+        config = {"allow_env_var_reads": ["PATH"]}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        assert engine.check_permission("os.getenv", ("PATH",))
+
+        engine.config["allow_env_var_reads"] = []
+        assert engine.check_permission("os.getenv", ("PATH",))
+
+        engine.record_decision("os.getenv", ("HOME",), allowed=True)
+        assert not engine.check_permission("os.getenv", ("PATH",))
+
+    def test_denied_env_read_is_not_cached(self, tmp_path):
+        """Test that denials are re-checked against the current config."""
+        config = {"allow_env_var_reads": []}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+        assert not engine.check_permission("os.getenv", ("PATH",))
+
+        engine.config["allow_env_var_reads"] = ["PATH"]
+        assert engine.check_permission("os.getenv", ("PATH",))
+
 
 class TestDecisionRecording:
     """Tests for review mode decision recording."""
@@ -1359,6 +1711,17 @@ class TestSocketConnect:
             "socket.connect", (None, ("2001:db8::1", 80))
         )
 
+    def test_invalid_ip_entry_skipped(self, tmp_path):
+        """Test that an unparsable allow_ips entry does not hide valid ones."""
+        config = {"allow_ips": ["not-an-ip", "10.0.0.0/8"]}
+        config_path = tmp_path / ".malwi-box.toml"
+        config_path.write_text(toml.dumps(config))
+
+        engine = BoxEngine(config_path=str(config_path), workdir=tmp_path)
+
+        assert engine.check_permission("socket.connect", (None, ("10.1.2.3", 80)))
+        assert not engine.check_permission("socket.connect", (None, ("11.0.0.1", 80)))
+
 
 class TestAdditionalDNSEvents:
     """Tests for additional DNS resolution events."""
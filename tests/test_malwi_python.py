@@ -528,6 +528,48 @@ class TestBinDirSetup:
         finally:
             cleanup_wrapper_bin_dir(bin_dir)
 
+    def test_setup_reuses_cached_bin_dir(self):
+        """Test that repeated setups share one bin dir that cleanup keeps."""
+        wrapper_path = get_malwi_python_path()
+        if wrapper_path is None:
+            pytest.skip("Wrapper not available")
+
+        first, _ = setup_wrapper_bin_dir(mode="run")
+        cleanup_wrapper_bin_dir(first)
+        second, _ = setup_wrapper_bin_dir(mode="review")
+
+        try:
+            assert first == second
+            assert (second / "python").exists()
+            assert os.path.samefile(second / "python", second / "python3")
+        finally:
+            cleanup_wrapper_bin_dir(second)
+
+    def test_cached_bin_dir_replaces_tampered_copy(self, tmp_path, monkeypatch):
+        """Test that a cached copy with the wrapper's size and mtime is re-checked."""
+        from malwi_box import wrapper
+
+        wrapper_path = get_malwi_python_path()
+        if wrapper_path is None:
+            pytest.skip("Wrapper not available")
+
+        monkeypatch.setattr(wrapper, "_user_cache_dir", lambda: tmp_path / "cache")
+        wrapper._cached_bin_dir.cache_clear()
+        bin_dir = wrapper._cached_bin_dir(wrapper_path)
+
+        python = bin_dir / "python"
+        wrapper_stat = wrapper_path.stat()
+        python.write_bytes(b"#" * wrapper_stat.st_size)
+        os.utime(python, ns=(wrapper_stat.st_atime_ns, wrapper_stat.st_mtime_ns))
+
+        wrapper._cached_bin_dir.cache_clear()
+        try:
+            assert wrapper._cached_bin_dir(wrapper_path) == bin_dir
+            assert python.read_bytes() == wrapper_path.read_bytes()
+            assert os.path.samefile(python, bin_dir / "python3")
+        finally:
+            wrapper._cached_bin_dir.cache_clear()
+
     def test_python_in_path_uses_wrapper(self):
         """Test that prepending bin_dir to PATH makes 'python' use wrapper."""
         wrapper_path = get_malwi_python_path()